@@ -1,48 +1,214 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import random
 import re
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 
+from formula_parser import FormulaError, degree_of_unsaturation, hill_formula, molecular_weight, parse_formula
+from pubchem_cache import ResponseCache, cache_key
+
+# HTTP client settings
+POOL_SIZE = 10                               # keep-alive connections kept open to PubChem
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+RETRIES = 3                                  # extra attempts after a 5xx / "server busy" answer
+BACKOFF = 0.5                                # seconds; doubles per attempt, with jitter
+RETRY_STATUSES = {500, 502, 503, 504}
+PROPERTIES = [
+    'MolecularFormula', 'MolecularWeight', 'IUPACName',
+    'CanonicalSMILES', 'InChI', 'XLogP', 'TPSA'
+]
+PROPERTY_BATCH = 150                         # CIDs per property request (keeps the URL under ~2 KB)
+RATE_LIMIT = 5                               # PubChem allows at most 5 requests per second
+BURST = 1                                    # evenly spaced, so no one-second window holds more than 5
+WORKERS = POOL_SIZE                          # concurrent lookups in a batch analysis
+
+
+# ------------------ Rate Limiting ------------------ #
+class TokenBucket:
+    """Thread-safe token bucket: on average ``rate`` acquisitions per second, bursts of up to ``capacity``.
+
+    Each caller reserves the next free slot under the lock and sleeps outside
+    it, so waiting threads are released in arrival order.
+    """
+
+    def __init__(self, rate, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
 class ChemicalStructureAPI:
-    def __init__(self):
+    def __init__(self, cache=None, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, retries=RETRIES, backoff=BACKOFF, rate_limit=RATE_LIMIT):
         self.pubchem_base = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
         self.chemspider_base = "https://www.chemspider.com/Chemical-Structure"
+        # Responses (including "not found") are kept on disk, so repeat
+        # lookups skip the network and still work offline. Pass cache=False
+        # to always ask PubChem.
+        self.cache = ResponseCache() if cache is None else cache or None
+        # One keep-alive session for every call: one TCP+TLS handshake per
+        # connection in the pool instead of one per request.
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        # Shared by every thread using this client; cache hits don't take a token.
+        self.limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.timings = []    # one {"url", "status", "attempts", "seconds"} per network call
+
+    def close(self):
+        self.session.close()
+
+    def _fetch(self, url):
+        """GET ``url`` on the pooled session, retrying 5xx answers and dropped connections with jittered backoff"""
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                response = None
+            if response is not None and (response.status_code not in RETRY_STATUSES or attempt == self.retries):
+                break
+            delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            time.sleep(delay)
+        self.timings.append({"url": url, "status": response.status_code, "attempts": attempt + 1,
+                             "seconds": time.perf_counter() - start})
+        return response
+
+    def timing_summary(self):
+        """Count, total, mean and slowest network time (seconds) over the calls made so far"""
+        seconds = [t["seconds"] for t in self.timings]
+        if not seconds:
+            return {"calls": 0, "total": 0, "mean": 0, "max": 0, "retried": 0}
+        return {"calls": len(seconds), "total": sum(seconds), "mean": sum(seconds) / len(seconds),
+                "max": max(seconds), "retried": sum(t["attempts"] > 1 for t in self.timings)}
+
+    def _get_json(self, url):
+        """GET ``url`` through the response cache; the parsed JSON, or None unless PubChem returned 200"""
+        key = cache_key(url)
+        cached = self.cache.get(key) if self.cache else None
+        if cached is None:
+            try:
+                response = self._fetch(url)
+            except requests.RequestException:
+                # Offline: an expired answer is better than none
+                cached = self.cache.get(key, allow_expired=True) if self.cache else None
+                if cached is None:
+                    raise
+            else:
+                cached = (response.status_code, response.content)
+                if self.cache and response.status_code in (200, 404):
+                    self.cache.put(key, *cached)
+        status, body = cached
+        return json.loads(body) if status == 200 else None
         
     def get_compound_from_pubchem(self, formula):
         """Get compound data from PubChem API using molecular formula"""
         try:
             # Search by molecular formula
             url = f"{self.pubchem_base}/compound/formula/{formula}/JSON"
-            response = requests.get(url, timeout=10)
+            data = self._get_json(url)
             
-            if response.status_code == 200:
-                data = response.json()
-                if 'PC_Compounds' in data:
-                    return data['PC_Compounds'][0]
+            if data and 'PC_Compounds' in data:
+                return data['PC_Compounds'][0]
             return None
         except Exception as e:
             print(f"PubChem API error: {e}")
             return None
     
+    def _properties_url(self, cids):
+        cid_list = ','.join(str(cid) for cid in cids)
+        return f"{self.pubchem_base}/compound/cid/{cid_list}/property/{','.join(PROPERTIES)}/JSON"
+
     def get_compound_properties(self, cid):
         """Get additional properties using compound ID"""
         try:
-            properties = [
-                'MolecularFormula', 'MolecularWeight', 'IUPACName', 
-                'CanonicalSMILES', 'InChI', 'XLogP', 'TPSA'
-            ]
-            prop_string = ','.join(properties)
-            url = f"{self.pubchem_base}/compound/cid/{cid}/property/{prop_string}/JSON"
+            url = self._properties_url([cid])
             
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
+            data = self._get_json(url)
+            if data:
                 return data['PropertyTable']['Properties'][0]
             return None
         except Exception as e:
             print(f"Properties API error: {e}")
             return None
+
+    def get_properties_batch(self, cids, batch_size=PROPERTY_BATCH):
+        """Properties for many CIDs, ``batch_size`` per request; {cid: properties or None}
+
+        Each compound's properties come back in the shape get_compound_properties()
+        returns, and are also cached under its single-CID request, so later
+        one-off lookups of the same compound don't touch the network either.
+        """
+        results = {}
+        wanted = []
+        for cid in dict.fromkeys(int(cid) for cid in cids):
+            cached = self.cache.get(cache_key(self._properties_url([cid]))) if self.cache else None
+            if cached is not None:
+                status, body = cached
+                results[cid] = json.loads(body)['PropertyTable']['Properties'][0] if status == 200 else None
+            else:
+                wanted.append(cid)
+        for start in range(0, len(wanted), batch_size):
+            chunk = wanted[start:start + batch_size]
+            try:
+                data = self._get_json(self._properties_url(chunk))
+                found = {row['CID']: row for row in data['PropertyTable']['Properties']} if data else {}
+            except Exception as e:
+                print(f"Properties API error: {e}")
+                found = {}
+            for cid in chunk:
+                results[cid] = found.get(cid)
+                if self.cache and cid in found:
+                    body = json.dumps({'PropertyTable': {'Properties': [found[cid]]}}).encode()
+                    self.cache.put(cache_key(self._properties_url([cid])), 200, body)
+        return results
+
+    def get_properties_for(self, compounds, batch_size=PROPERTY_BATCH, workers=WORKERS):
+        """Properties for a mix of formulas and CIDs; {formula or cid: (cid, properties)}
+
+        Formulas still need one search each to find their CID; those run on
+        ``workers`` threads (within the rate limit) and the property lookups
+        for all of them are then batched.
+        """
+        cids = {}
+        formulas = []
+        for compound in dict.fromkeys(compounds):
+            if isinstance(compound, int) or str(compound).isdigit():
+                cids[compound] = int(compound)
+            else:
+                formulas.append(compound)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for formula, data in zip(formulas, pool.map(self.get_compound_from_pubchem, formulas)):
+                cids[formula] = data['id']['id']['cid'] if data else None
+        properties = self.get_properties_batch([cid for cid in cids.values() if cid is not None], batch_size)
+        return {compound: (cid, properties.get(cid)) for compound, cid in cids.items()}
     
     def get_structure_image_url(self, cid, size='large'):
         """Get 2D structure image URL from PubChem"""
@@ -84,22 +250,44 @@ class OrganicCompoundAnalyzer:
         print(f"ANALYZING: {formula}")
         print(f"{'='*50}")
         
+        # Answer what the formula alone can tell before any network call
+        local = self._local_analysis(formula)
+        
         # Get basic compound data
         compound_data = self.api.get_compound_from_pubchem(formula)
         
-        if not compound_data:
-            print("❌ Compound not found in PubChem database")
+        # Extract CID (Compound ID) and get detailed properties
+        cid = compound_data['id']['id']['cid'] if compound_data else None
+        properties = self.api.get_compound_properties(cid) if cid else None
+        self._report(formula, cid, properties, local)
+
+    def analyze_batch(self, formulas, workers=WORKERS):
+        """Analyse a list of formulas concurrently; reports are printed in input order
+
+        Lookups run on ``workers`` threads, all sharing the client's rate
+        limit, and properties are fetched in batched requests. Nothing is
+        printed until every lookup is done, so reports never interleave.
+        """
+        formulas = list(formulas)
+        results = self.api.get_properties_for(formulas, workers=workers)
+        for formula in formulas:
+            cid, properties = results[formula]
+            print(f"\n{'='*50}")
+            print(f"ANALYZING: {formula}")
+            print(f"{'='*50}")
+            self._report(formula, cid, properties, self._local_analysis(formula))
+
+    def _report(self, formula, cid, properties, local):
+        """PubChem's view of the compound, after the local analysis ``local`` was printed"""
+        if not cid:
+            print("\n❌ Compound not found in PubChem database")
             print("Falling back to basic structure generation...")
-            self._fallback_analysis(formula)
+            if local:
+                self._generate_basic_structure(*local)
             return
         
-        # Extract CID (Compound ID)
-        cid = compound_data['id']['id']['cid']
         print(f"✅ Found in PubChem! CID: {cid}")
         
-        # Get detailed properties
-        properties = self.api.get_compound_properties(cid)
-        
         if properties:
             self._display_compound_info(properties, cid)
             self._generate_structure_from_smiles(properties.get('CanonicalSMILES'))
@@ -196,41 +384,59 @@ class OrganicCompoundAnalyzer:
     def _fallback_analysis(self, formula):
         """Fallback analysis when API fails"""
         print("\n🔄 Using offline analysis...")
+        local = self._local_analysis(formula)
+        if local:
+            self._generate_basic_structure(*local)
+
+    def _local_analysis(self, formula):
+        """Print what the formula alone gives (no network); ``(carbon_count, bond_symbol)`` for organics, else None"""
+        # Count every element (groups and hydrates expanded)
+        try:
+            counts = parse_formula(formula)
+        except FormulaError as e:
+            print(f"❌ Can't read formula: {e}")
+            return None
         
-        # Extract atoms
-        carbon_match = re.search(r'C(\d*)', formula)
-        hydrogen_match = re.search(r'H(\d*)', formula)
+        carbon_count = counts.get('C', 0)
+        hydrogen_count = counts.get('H', 0)
+        unsaturation = degree_of_unsaturation(formula)
+        hydrocarbon = set(counts) <= {'C', 'H'}
         
-        carbon_count = 1 if carbon_match and carbon_match.group(1) == '' else int(carbon_match.group(1)) if carbon_match else 0
-        hydrogen_count = 1 if hydrogen_match and hydrogen_match.group(1) == '' else int(hydrogen_match.group(1)) if hydrogen_match else 0
+        lines = [
+            f"Hill formula: {hill_formula(formula)}",
+            f"Molecular Weight: {molecular_weight(formula)} g/mol",
+            f"Carbon atoms: {carbon_count}",
+            f"Hydrogen atoms: {hydrogen_count}",
+        ]
+        others = ', '.join(f"{name} {count}" for name, count in sorted(counts.items()) if name not in ('C', 'H'))
+        if others:
+            lines.append(f"Other atoms: {others}")
+        if carbon_count > 0:
+            # Rings plus pi bonds; only meaningful for organic compounds
+            lines.append(f"Degree of unsaturation: {unsaturation}")
         
         print(f"📊 Basic Analysis:")
-        print(f"├─ Carbon atoms: {carbon_count}")
-        print(f"├─ Hydrogen atoms: {hydrogen_count}")
+        for i, line in enumerate(lines):
+            print(f"{'└' if i == len(lines) - 1 and not carbon_count else '├'}─ {line}")
         
         # Determine compound type
         if carbon_count > 0:
-            expected_alkane = 2 * carbon_count + 2
-            expected_alkene = 2 * carbon_count
-            expected_alkyne = 2 * carbon_count - 2
-            
-            if hydrogen_count == expected_alkane:
-                compound_type = "Alkane (single bonds)"
+            if unsaturation == 0:
+                compound_type = "Alkane (single bonds)" if hydrocarbon else "Saturated compound (single bonds)"
                 bond_symbol = "-"
-            elif hydrogen_count == expected_alkene:
-                compound_type = "Alkene (double bond)"
+            elif unsaturation == 1:
+                compound_type = "Alkene (double bond)" if hydrocarbon else "One double bond or ring"
                 bond_symbol = "="
-            elif hydrogen_count == expected_alkyne:
-                compound_type = "Alkyne (triple bond)"
+            elif unsaturation == 2:
+                compound_type = "Alkyne (triple bond)" if hydrocarbon else "Triple bond, or two double bonds/rings"
                 bond_symbol = "≡"
             else:
                 compound_type = "Unknown/Complex compound"
                 bond_symbol = "-"
             
             print(f"└─ Compound type: {compound_type}")
-            
-            # Generate basic structure
-            self._generate_basic_structure(carbon_count, bond_symbol)
+            return carbon_count, bond_symbol
+        return None
     
     def _generate_basic_structure(self, carbon_count, bond_symbol):
         """Generate basic structure representation"""
@@ -272,15 +478,33 @@ class OrganicCompoundAnalyzer:
         for line in structure:
             print(f"    {line}")
 
+def clean_formula(formula):
+    # All-lowercase input ("c2h6") is upper-cased; anything else is kept as
+    # typed so two-letter elements (Cl, Na, Br) survive.
+    if formula != formula.lower():
+        return formula
+    return ''.join([char.upper() if char.isalpha() else char for char in formula])
+
 def main():
     """Main program with API integration"""
     analyzer = OrganicCompoundAnalyzer()
     
+    # Formulas on the command line (or "--file PATH", one per line) are
+    # analysed together as a batch instead of starting the prompt.
+    args = sys.argv[1:]
+    if args:
+        if args[0] == '--file':
+            with open(args[1], encoding='utf-8') as f:
+                args = [line.strip() for line in f if line.strip()]
+        analyzer.analyze_batch([clean_formula(formula) for formula in args])
+        return
+    
     print("🧬 ADVANCED CHEMICAL STRUCTURE ANALYZER")
     print("💡 Powered by PubChem API for unlimited compound data!")
     print("📝 Enter formulas like: CH4, C2H4, C2H2, C6H6, etc.")
     print("⚠️  Note: Requires internet connection for full features")
-    print("\nType 'quit' to exit, 'help' for examples")
+    print("📦 Enter several formulas separated by spaces or commas to analyse them together")
+    print("\nType 'quit' to exit, 'help' for examples, 'timing' for network timings")
     
     example_compounds = [
         "CH4", "C2H6", "C3H8", "C4H10",  # Alkanes
@@ -302,14 +526,22 @@ def main():
             for i, compound in enumerate(example_compounds, 1):
                 print(f"{i:2d}. {compound}")
             continue
+        elif formula.lower() == 'timing':
+            summary = analyzer.api.timing_summary()
+            print(f"\n⏱️  {summary['calls']} network calls, {summary['retried']} retried, "
+                  f"mean {summary['mean'] * 1000:.0f} ms, slowest {summary['max'] * 1000:.0f} ms")
+            continue
         elif not formula:
             print("❌ Please enter a valid chemical formula")
             continue
         
         try:
-            # Clean up the formula
-            clean_formula = ''.join([char.upper() if char.isalpha() else char for char in formula])
-            analyzer.analyze_compound(clean_formula)
+            # Clean up the formula(s)
+            formulas = [clean_formula(f) for f in re.split(r'[\s,]+', formula) if f]
+            if len(formulas) > 1:
+                analyzer.analyze_batch(formulas)
+            else:
+                analyzer.analyze_compound(formulas[0])
             
         except KeyboardInterrupt:
             print("\n⏹️  Operation cancelled by user")
@@ -0,0 +1,241 @@
+import argparse
+import json
+import math
+import os
+import shlex
+import sys
+
+from class_stats import stats_for
+from report_archive import ReportCardArchive
+from report_card import CORE_SUBJECTS, OPTIONAL_SUBJECT, REPORT_ARCHIVE, grade_subject, write_report_card
+from student_store import SCORES_FILE, StudentStore, load_store, parse_score, save_store
+
+# ------------------ Script Format ------------------ #
+# One operation per line, either a JSON object or shell-style words:
+#   {"op": "add", "name": "Soala_Amachree", "score": 97}
+#   add Soala_Amachree 97
+# Blank lines and lines starting with # are skipped. Each operation produces
+# one JSON result line: {"line", "op", "ok", "result"} or {..., "error"}.
+# report_card takes its CAT scores as {"<subject>": [cat1, cat2], ...} and is
+# only available in JSON form.
+ARGUMENTS = {
+    "add": ("name", "score"),
+    "delete": ("name",),
+    "get": ("name",),
+    "stats": (),
+    "names": (),
+    "ranking": ("top",),
+    "bottom": ("count",),
+    "band": ("low", "high"),
+    "report_card": ("name",),
+    "clear": ("password",),
+    "save": (),
+}
+WRITES = {"add", "delete", "report_card", "clear"}
+
+
+class BatchError(Exception):
+    pass
+
+
+def parse_line(line):
+    """``(op, args)`` for one script line, or None for blank lines and comments."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        args = json.loads(line)
+        op = args.pop("op", None)
+    else:
+        words = shlex.split(line)
+        op, values = words[0], words[1:]
+        if op in ARGUMENTS and len(values) > len(ARGUMENTS[op]):
+            raise BatchError(f"too many arguments for {op!r}")
+        args = dict(zip(ARGUMENTS.get(op, ()), values))
+    if op not in ARGUMENTS:
+        raise BatchError(f"unknown operation {op!r}")
+    return op, args
+
+
+def _check_name(name):
+    """Reject names that can't be stored or that would leave the report-card folder."""
+    if not isinstance(name, str) or not name.strip() or name in (".", ".."):
+        raise BatchError(f"invalid student name {name!r}")
+    if any(sep and sep in name for sep in ("/", "\\", os.sep, os.altsep)):
+        raise BatchError(f"student name {name!r} must not contain a path separator")
+    return name
+
+
+def _score(value):
+    """A finite int/float score from a JSON number or a script word."""
+    if isinstance(value, bool):
+        raise BatchError(f"not a usable score: {value!r}")
+    if not isinstance(value, (int, float)):
+        return parse_score(value)
+    if not math.isfinite(value):
+        raise BatchError(f"not a usable score: {value!r}")
+    return value
+
+
+def _find(students, name):
+    if name in students:
+        return name
+    found = students.names.lookup(name)
+    if found is None:
+        suggestions = students.names.suggest(name)
+        hint = f" (did you mean: {', '.join(suggestions)}?)" if suggestions else ""
+        raise BatchError(f"student {name!r} not found{hint}")
+    return found
+
+
+def _report_card(students, args, archive):
+    name, cats = _check_name(args["name"]), args.get("scores")
+    if not isinstance(cats, dict):
+        raise BatchError("report_card needs a JSON 'scores' object of {subject: [cat1, cat2]}")
+    scores = {}
+    for subject in CORE_SUBJECTS + [OPTIONAL_SUBJECT]:
+        if subject in cats:
+            cat1, cat2 = cats[subject]
+            scores[subject] = grade_subject(float(cat1), float(cat2))
+        elif subject != OPTIONAL_SUBJECT:
+            raise BatchError(f"missing scores for {subject}")
+    students[name] = write_report_card(name, scores, args.get("academic_remark", ""),
+                                       args.get("behavioral_remark", ""), archive=archive)
+    return {"name": name, "average": students[name]}
+
+
+def execute(students, op, args, admin_password=None, archive=REPORT_ARCHIVE):
+    """Apply one operation to ``students`` and return its JSON-ready result.
+
+    ``archive`` (a zip path or an open ReportCardArchive) receives report cards.
+    """
+    if op == "add":
+        _check_name(args["name"])
+        students[args["name"]] = _score(args["score"])
+        return {"name": args["name"], "score": students[args["name"]]}
+    if op == "delete":
+        name = _find(students, args["name"])
+        del students[name]
+        return {"name": name}
+    if op == "get":
+        name = _find(students, args["name"])
+        return {"name": name, "score": students[name], "rank": students.ranking.rank(name),
+                "ties": students.ranking.ties(name)}
+    if op == "stats":
+        stats = stats_for(students)
+        return {"count": stats.count, "highest": stats.highest, "lowest": stats.lowest,
+                "average": stats.average, "bins": stats.bins}
+    if op == "names":
+        return sorted(students)
+    if op == "ranking":
+        top = int(args.get("top") or len(students))
+        return [[name, score] for name, score in students.ranking.top(top)]
+    if op == "bottom":
+        return [[name, score] for name, score in students.ranking.bottom(int(args.get("count") or 10))]
+    if op == "band":
+        band = students.ranking.band(float(args["low"]), float(args.get("high", 100)))
+        return [[name, score] for name, score in band]
+    if op == "report_card":
+        return _report_card(students, args, archive)
+    if op == "clear":
+        if admin_password is None or args.get("password") != admin_password:
+            raise BatchError("access denied")
+        students.clear()
+        return {}
+    raise BatchError(f"unknown operation {op!r}")
+
+
+# ------------------ Runner ------------------ #
+def run_batch(lines, students, save, admin_password=None, checkpoint=None, output=None):
+    """Run script ``lines`` against one loaded store and print a JSON result per operation.
+
+    The store is saved once at the end (and by explicit ``save`` operations),
+    or every ``checkpoint`` writes when given. Returns the number of failed
+    operations. With REPORT_ARCHIVE set, the archive is opened at the first
+    report card and kept open for the rest of the run.
+    """
+    output = output or sys.stdout
+    failures = writes = unsaved = 0
+    cards = None
+    try:
+        for number, line in enumerate(lines, 1):
+            result = {"line": number}
+            try:
+                parsed = parse_line(line)
+                if parsed is None:
+                    continue
+                op, args = parsed
+                result["op"] = op
+                if op == "save":
+                    save(students)
+                    unsaved = 0
+                    result["result"] = {"saved": len(students)}
+                else:
+                    if op == "report_card" and REPORT_ARCHIVE and cards is None:
+                        cards = ReportCardArchive(REPORT_ARCHIVE, "a")
+                    result["result"] = execute(students, op, args, admin_password,
+                                                     REPORT_ARCHIVE if cards is None else cards)
+                    if op in WRITES:
+                        writes += 1
+                        unsaved += 1
+                result["ok"] = True
+            except (BatchError, KeyError, OSError, TypeError, ValueError) as e:
+                failures += 1
+                result["ok"] = False
+                result["error"] = f"missing argument {e}" if isinstance(e, KeyError) else str(e)
+            print(json.dumps(result), file=output)
+            if checkpoint and unsaved >= checkpoint:
+                save(students)
+                unsaved = 0
+    finally:
+        try:
+            if cards is not None:
+                cards.close()
+        finally:
+            # Even a run cut short keeps the writes that already succeeded
+            if unsaved:
+                save(students)
+    print(json.dumps({"op": "summary", "ok": not failures, "writes": writes, "failed": failures,
+                      "students": len(students)}), file=output)
+    return failures
+
+
+def main(argv=None, load=None, save=None, admin_password=None):
+    """``--batch FILE`` entry point; the menu scripts pass in their own load/save functions.
+
+    ``load(path)`` and ``save(students, path)`` are given the ``--scores-file`` path.
+    """
+    parser = argparse.ArgumentParser(description="Run a script of student-store operations without prompts.")
+    parser.add_argument("--batch", required=True, metavar="FILE", help="script or JSONL file ('-' for stdin)")
+    parser.add_argument("--checkpoint", type=int, default=None, metavar="N",
+                        help="save after every N writes instead of only at the end")
+    parser.add_argument("--output", default=None, help="write results here instead of stdout")
+    parser.add_argument("--scores-file", default=SCORES_FILE)
+    args, _ = parser.parse_known_args(argv)
+
+    if load is None:
+        def load(path):
+            try:
+                return load_store(path)
+            except FileNotFoundError:
+                return StudentStore()
+    save_to = save or save_store
+
+    def save(students):
+        save_to(students, args.scores_file)
+
+    students = load(args.scores_file)
+    source = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        failures = run_batch(source, students, save, admin_password, args.checkpoint, output)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
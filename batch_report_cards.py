@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from partitions import partition_path
+from report_archive import ReportCardArchive
+from report_card import (
+    CORE_SUBJECTS, DEFAULT_CLASS, DEFAULT_TERM, DEFAULT_YEAR, GRADE_LETTERS, GRADE_REMARKS,
+    OPTIONAL_SUBJECT, grade_cohort, overall_average, report_card_rows, write_report_card
+)
+from student_store import SCORES_FILE, StudentStore, load_store, save_store
+
+# Input layout: one row per student, with a header of
+#   Name, <Subject> CAT1, <Subject> CAT2, ..., Academic Remark, Behavioral Remark
+# Leave the Agric Science columns blank (or 0) for students who don't offer it.
+NAME_COLUMN = "Name"
+ACADEMIC_COLUMN = "Academic Remark"
+BEHAVIORAL_COLUMN = "Behavioral Remark"
+
+
+def input_columns():
+    columns = [NAME_COLUMN]
+    for subject in CORE_SUBJECTS + [OPTIONAL_SUBJECT]:
+        columns += [f"{subject} CAT1", f"{subject} CAT2"]
+    return columns + [ACADEMIC_COLUMN, BEHAVIORAL_COLUMN]
+
+
+def write_template(path):
+    with open(path, mode="w", newline="") as file:
+        csv.writer(file).writerow(input_columns())
+
+
+def read_batch(path):
+    with open(path, mode="r", newline="") as file:
+        yield from csv.DictReader(file)
+
+
+def parse_cats(row):
+    """``{subject: (cat1, cat2)}`` for one input row; Agric Science only when it is offered."""
+    cats = {}
+    for subject in CORE_SUBJECTS:
+        cats[subject] = (float(row[f"{subject} CAT1"]), float(row[f"{subject} CAT2"]))
+    agric = (row.get(f"{OPTIONAL_SUBJECT} CAT1") or "").strip()
+    if agric and float(agric) != 0:
+        cats[OPTIONAL_SUBJECT] = (float(agric), float(row[f"{OPTIONAL_SUBJECT} CAT2"]))
+    return cats
+
+
+def grade_rows(cats_rows):
+    """Grade many rows' CATs with one ``grade_cohort()`` call per subject.
+
+    Returns one scores dict per row, in the same shape ``input_score()`` returns.
+    """
+    graded = [{} for _ in cats_rows]
+    for subject in CORE_SUBJECTS + [OPTIONAL_SUBJECT]:
+        rows = [i for i, cats in enumerate(cats_rows) if subject in cats]
+        if not rows:
+            continue
+        cat1 = [cats_rows[i][subject][0] for i in rows]
+        cat2 = [cats_rows[i][subject][1] for i in rows]
+        cohort = grade_cohort(cat1, cat2)
+        for k, i in enumerate(rows):
+            code = int(cohort["grade"][k])
+            graded[i][subject] = {
+                "cat1": cat1[k], "cat2": cat2[k], "assignment": float(cohort["assignment"][k]),
+                "total": float(cohort["total"][k]), "grade": GRADE_LETTERS[code], "remark": GRADE_REMARKS[code]
+            }
+    return graded
+
+
+def parse_scores(row):
+    """Grade every subject in one input row, in the same shape ``input_score()`` returns."""
+    return grade_rows([parse_cats(row)])[0]
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _build_cards(job):
+    """Grade a chunk of rows together: ``(name, average, rows, error)`` per input row.
+
+    Writes each ``{name}.csv``, or with no ``out_dir`` returns the rows for the archive.
+    """
+    chunk, out_dir, period = job
+    results = [None] * len(chunk)
+    parsed = []
+    for i, row in enumerate(chunk):
+        try:
+            parsed.append((i, parse_cats(row)))
+        except (KeyError, TypeError, ValueError) as e:
+            results[i] = (row[NAME_COLUMN].strip(), None, None, f"bad scores: {e}")
+    for (i, _), scores in zip(parsed, grade_rows([cats for _, cats in parsed])):
+        row = chunk[i]
+        name = row[NAME_COLUMN].strip()
+        academic, behavioral = row.get(ACADEMIC_COLUMN, ""), row.get(BEHAVIORAL_COLUMN, "")
+        if out_dir is None:
+            rows = report_card_rows(name, scores, academic, behavioral, *period)
+            results[i] = (name, overall_average(scores), rows, None)
+        else:
+            filename = os.path.join(out_dir, f"{name}.csv")
+            results[i] = (name, write_report_card(name, scores, academic, behavioral, filename, *period), None, None)
+    return results
+
+
+def generate_report_cards(input_path, students, out_dir=".", workers=None,
+                          chunksize=64, progress=True, class_name=DEFAULT_CLASS,
+                          term=DEFAULT_TERM, year=DEFAULT_YEAR, archive=None):
+    """Write a report card for every row of ``input_path`` across a process pool.
+
+    Each worker grades ``chunksize`` rows at a time, one grade_cohort() call
+    per subject. With ``archive``, the cards go into that one zip (see report_archive.py)
+    instead of a file per student; workers grade and the parent writes.
+    Each student's overall average is stored in ``students`` (without saving);
+    returns a list of ``(name, error)`` for rows that could not be graded.
+    """
+    if archive:
+        out_dir = None
+    else:
+        os.makedirs(out_dir, exist_ok=True)
+    period = (class_name, term, year)
+    rows = (row for row in read_batch(input_path) if row.get(NAME_COLUMN))
+    jobs = ((chunk, out_dir, period) for chunk in _chunks(rows, chunksize))
+    errors = []
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            ReportCardArchive(archive, "a") if archive else contextlib.nullcontext() as cards:
+        for results in pool.map(_build_cards, jobs):
+            for name, average, rows, error in results:
+                done += 1
+                if error:
+                    errors.append((name, error))
+                    continue
+                if cards is not None:
+                    cards.add(name, rows, average, *period)
+                students[name] = average
+                if progress and done % 100 == 0:
+                    print(f"\rReport cards: {done} written", end="", file=sys.stderr, flush=True)
+    if progress:
+        print(f"\rReport cards: {done - len(errors)} written, {len(errors)} skipped", file=sys.stderr)
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate report cards for a whole class from one input file.")
+    parser.add_argument("input", help="CSV with one row of CAT1/CAT2 scores and remarks per student")
+    parser.add_argument("--out-dir", default=".", help="where to write the {name}.csv report cards")
+    parser.add_argument("--archive", default=None,
+                        help="write every card into this .zip instead of one file per student")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--class", dest="class_name", default=DEFAULT_CLASS)
+    parser.add_argument("--term", default=DEFAULT_TERM)
+    parser.add_argument("--year", default=DEFAULT_YEAR)
+    parser.add_argument("--scores-file", default=SCORES_FILE, help="class score store to update")
+    parser.add_argument("--partition-root", default=None,
+                        help="update the class/term/year partition under this root instead of --scores-file")
+    parser.add_argument("--template", action="store_true", help="write an empty input file with the expected header and exit")
+    args = parser.parse_args(argv)
+
+    if args.template:
+        write_template(args.input)
+        print(f"Template written to {args.input}")
+        return 0
+
+    if args.partition_root:
+        args.scores_file = partition_path(args.class_name, args.term, args.year, args.partition_root)
+        os.makedirs(os.path.dirname(args.scores_file), exist_ok=True)
+    try:
+        students = load_store(args.scores_file)
+    except FileNotFoundError:
+        students = StudentStore()
+    errors = generate_report_cards(args.input, students, args.out_dir, args.workers,
+                                   class_name=args.class_name, term=args.term, year=args.year,
+                                   archive=args.archive)
+    save_store(students, args.scores_file)
+    for name, error in errors:
+        print(f"Skipped {name}: {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+import argparse
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SIZES = (1_000, 10_000, 100_000)
+ENTRY_POINTS = ["records.py", "final copy.py", "student.py", "student_score.py"]
+IMPORTABLE = ["records.py", "final copy.py", "student.py"]   # student_score.py prompts at import
+LOOKUPS = 1_000
+CHANGES = 100
+RESULTS_FILE = "benchmark_results.json"
+
+FIRST_NAMES = ["Soala", "Desmond", "Obasi", "Joshua", "Christopher", "Amadi", "Havilah", "Grace",
+               "Redeemer", "Nwandike", "Aguma", "Jensen", "Nora", "Sarima", "Onyesiuwe", "Flourish",
+               "Ibeya", "Lilian", "Melvin", "Delight", "Morenike", "Prasie", "Olayinka", "Chatem",
+               "Sarah", "Francis", "David", "Chiamaka", "Tekena", "Ada", "Bola", "Emeka"]
+LAST_NAMES = ["Amachree", "Ozondu", "Princewill", "Eze", "Egere", "Greatman", "Oghenejivwe",
+              "Chitchuga", "Messiah", "Darlington", "Michelle", "Ogu", "Ella", "Obasi", "Tekena",
+              "Nick", "Justice", "Abioye", "Julia", "John", "Ernsest", "Okafor", "Adeyemi", "Bello"]
+
+
+# ------------------ Synthetic Roster ------------------ #
+def synthetic_roster(n, seed=0):
+    """A deterministic ``{First_Last: score}`` roster of ``n`` students.
+
+    Names repeat the usual First_Last shape (clashes get a numeric suffix);
+    most scores are whole numbers and one in five is a report-card average.
+    """
+    rng = random.Random(seed)
+    roster = {}
+    for i in range(n):
+        name = f"{rng.choice(FIRST_NAMES)}_{rng.choice(LAST_NAMES)}"
+        if name in roster:
+            name = f"{name}{i}"
+        roster[name] = rng.randint(0, 100) if rng.random() < 0.8 else round(rng.uniform(0, 100), 2)
+    return roster
+
+
+def write_roster(roster, path):
+    with open(path, mode="w", newline="") as file:
+        csv.writer(file).writerows(roster.items())
+
+
+# ------------------ Measuring ------------------ #
+def measure(func, memory=False):
+    """``(seconds, peak_bytes, result)``; peak is only traced when ``memory`` is set."""
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak, result
+
+
+class Recorder:
+    def __init__(self, memory=False, verbose=True):
+        self.memory = memory
+        self.verbose = verbose
+        self.results = []
+
+    def run(self, size, storage, entry, op, func, traced=True):
+        seconds, peak, result = measure(func, self.memory and traced)
+        self.results.append({"size": size, "storage": storage, "entry": entry, "op": op,
+                             "seconds": seconds, "peak_bytes": peak})
+        if self.verbose:
+            memory = f" {peak / 1e6:9.1f} MB" if peak is not None else ""
+            print(f"{size:>10,} {storage:<7} {entry:<17} {op:<24}{seconds * 1000:11.2f} ms{memory}",
+                  file=sys.stderr)
+        return result
+
+
+def _import_entry(filename):
+    """Import an entry-point script by path (``final copy.py`` has a space in it)."""
+    name = "bench_" + os.path.splitext(filename)[0].replace(" ", "_")
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _clear_files(path):
+    for suffix in ("", ".journal", ".cache", ".lock"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path + suffix)
+
+
+# ------------------ Benchmarks ------------------ #
+def bench_entry_points(recorder, size, roster, csv_path, rng):
+    """The menu functions of each importable entry point against a CSV store."""
+    sample = rng.sample(sorted(roster), min(LOOKUPS, len(roster)))
+    for filename in IMPORTABLE:
+        module = _import_entry(filename)
+        write_roster(roster, csv_path)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(csv_path + ".cache")
+        run = lambda op, func: recorder.run(size, "csv", filename, op, func)
+
+        run("load_students (parse)", module.load_students)
+        students = run("load_students (cached)", module.load_students)
+        for i, name in enumerate(sample[:CHANGES]):
+            students[name] = i % 101
+        run(f"save_students ({CHANGES} changes)", lambda: module.save_students(students))
+        run("rank_students", lambda: module.rank_students(students))
+        run("calculate_statistics", lambda: module.calculate_statistics(students))
+        run("show_histogram", lambda: module.show_histogram(students))
+        run(f"rank lookup x{len(sample)}", lambda: [students.ranking.rank(name) for name in sample])
+        run(f"name suggest x{min(100, len(sample))}",
+            lambda: [students.names.suggest(name.lower()[:-1]) for name in sample[:100]])
+
+
+def bench_storage(recorder, size, roster, workdir, rng):
+    """Loading and saving the same roster through each storage backend."""
+    from binary_store import BinaryScoreStore
+    from score_array import ScoreArray
+    from student_store import compact_store, load_store, save_store
+
+    changes = rng.sample(sorted(roster), min(CHANGES, len(roster)))
+    for storage, filename in (("csv", "bench.csv"), ("sqlite", "bench.db")):
+        path = os.path.join(workdir, filename)
+        _clear_files(path)
+        run = lambda op, func: recorder.run(size, storage, "student_store", op, func)
+        run("full write", lambda: save_store(dict(roster), path))
+        if storage == "csv":
+            os.remove(path + ".cache")
+            run("load (parse)", lambda: load_store(path))
+        students = run("load", lambda: load_store(path))
+        for i, name in enumerate(changes):
+            students[name] = i % 101
+        run(f"save ({CHANGES} changes)", lambda: save_store(students, path))
+        if storage == "csv":
+            run("compact", lambda: compact_store(students, path))
+            run("ScoreArray.load", lambda: ScoreArray.load(path))
+
+    path = os.path.join(workdir, "bench.bin")
+    for suffix in ("", ".idx"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path + suffix)
+    run = lambda op, func: recorder.run(size, "binary", "binary_store", op, func)
+    run("create", lambda: BinaryScoreStore.create(path, roster.items()).close())
+
+    def updates():
+        with BinaryScoreStore(path) as store:
+            for i, name in enumerate(changes):
+                store[name] = i % 101
+    run(f"update {CHANGES}", updates)
+
+    def lookups():
+        with BinaryScoreStore(path) as store:
+            return [store[name] for name in changes]
+    run(f"lookup {len(changes)}", lookups)
+
+
+def bench_scripts(recorder, size, roster, workdir, rng):
+    """Each entry point end to end as a process: start, look one student up, show stats, exit."""
+    name = rng.choice(sorted(roster))
+    first, _, last = name.partition("_")
+    inputs = {
+        "records.py": f"2\n{name}\n3\n7\n",
+        "final copy.py": f"2\n{first}\n{last}\n3\n8\n",
+        "student.py": f"{first}\n{last}\nno\nyes\nno\n",
+        "student_score.py": f"{first}\n{last}\nno\nyes\nno\n",
+    }
+    env = dict(os.environ, STUDENT_SCORES_FILE="students_score.csv", MPLBACKEND="Agg")
+    env.pop("REPORT_CARD_ARCHIVE", None)
+    csv_path = os.path.join(workdir, "students_score.csv")
+
+    def run_script(filename):
+        completed = subprocess.run([sys.executable, os.path.join(REPO_DIR, filename)], input=inputs[filename],
+                                   cwd=workdir, env=env, capture_output=True, text=True, encoding="utf-8")
+        if completed.returncode != 0:
+            raise RuntimeError(f"{filename} exited with status {completed.returncode} "
+                               f"at {size:,} students:\n{completed.stderr}")
+
+    for filename in ENTRY_POINTS:
+        _clear_files(csv_path)
+        write_roster(roster, csv_path)
+        for op in ("run (cold cache)", "run (warm cache)"):
+            recorder.run(size, "csv", filename, op, lambda: run_script(filename), traced=False)
+
+
+def run_benchmarks(sizes=SIZES, seed=0, memory=False, scripts=True, verbose=True):
+    recorder = Recorder(memory, verbose)
+    workdir = tempfile.mkdtemp(prefix="student_bench_")
+    previous = os.getcwd()
+    os.chdir(workdir)   # entry points read and write students_score.csv in the working directory
+    sys.path.insert(0, REPO_DIR)
+    try:
+        for size in sizes:
+            roster = synthetic_roster(size, seed)
+            rng = random.Random(seed)
+            bench_entry_points(recorder, size, roster, os.path.join(workdir, "students_score.csv"), rng)
+            bench_storage(recorder, size, roster, workdir, rng)
+            if scripts:
+                bench_scripts(recorder, size, roster, workdir, rng)
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return recorder.results
+
+
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline):
+    """Print each timing next to the matching one in ``baseline`` (an earlier results file)."""
+    key = lambda r: (r["size"], r["storage"], r["entry"], r["op"])
+    before = {key(r): r["seconds"] for r in baseline["results"]}
+    print(f"{'size':>10} {'storage':<7} {'entry':<17} {'op':<24}{'before':>12}{'after':>12}  ratio")
+    for r in results:
+        if key(r) in before:
+            old = before[key(r)]
+            print(f"{r['size']:>10,} {r['storage']:<7} {r['entry']:<17} {r['op']:<24}"
+                  f"{old * 1000:10.2f}ms{r['seconds'] * 1000:10.2f}ms  {r['seconds'] / old if old else float('inf'):5.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the student store and entry points on synthetic rosters.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma-separated roster sizes, e.g. 1000,1000000,10000000")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="also trace peak Python allocations (timings then include the tracing overhead)")
+    parser.add_argument("--no-scripts", action="store_true", help="skip the end-to-end process runs")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--compare", metavar="JSON", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    # The entry points bind their scores file at import; keep them in the scratch directory.
+    os.environ["STUDENT_SCORES_FILE"] = "students_score.csv"
+    os.environ.pop("REPORT_CARD_ARCHIVE", None)
+    output = os.path.abspath(args.output)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run_benchmarks(sizes, args.seed, args.memory, not args.no_scripts)
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "revision": _revision(), "seed": args.seed, "memory": args.memory,
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    with open(output, "w") as file:
+        json.dump(report, file, indent=1)
+    print(f"Results written to {output}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
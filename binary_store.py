@@ -0,0 +1,330 @@
+import argparse
+import contextlib
+import csv
+import mmap
+import os
+import struct
+import sys
+
+from student_store import SCORES_FILE, StudentStore, iter_score_rows, journal_path, replay_journal
+
+# ------------------ Layout ------------------ #
+# <name>.bin  header + fixed-width score records, one per slot
+#             record: score (float64), live flag (uint8), padding
+# <name>.idx  header + fixed-width (name, slot) entries; the first
+#             ``sorted`` entries are ordered by name for binary search,
+#             later ones are appended unsorted until the next compaction
+BINARY_FILE = 'students_score.bin'
+INDEX_SUFFIX = '.idx'
+NAME_WIDTH = 48                 # bytes of UTF-8 per name, NUL padded
+TAIL_LIMIT = 1024               # unsorted index entries before re-sorting
+
+_BIN_HEADER = struct.Struct('<4sHxxQQ')        # magic, version, slots used, live students
+_RECORD = struct.Struct('<dB7x')
+_IDX_HEADER = struct.Struct('<4sHxxQQ')        # magic, version, entries used, sorted entries
+_ENTRY = struct.Struct(f'<{NAME_WIDTH}sQ')
+_BIN_MAGIC, _IDX_MAGIC, _VERSION = b'STSC', b'STIX', 1
+
+
+def _encode(name):
+    raw = name.encode('utf-8')
+    if len(raw) > NAME_WIDTH or b'\0' in raw:
+        raise ValueError(f"name does not fit a {NAME_WIDTH}-byte index entry: {name!r}")
+    return raw.ljust(NAME_WIDTH, b'\0')
+
+
+def _whole(score):
+    return int(score) if score.is_integer() else score
+
+
+def _capacity(count):
+    return max(1024, 1 << max(count - 1, 0).bit_length())
+
+
+def _create(path, magic, header, item, count, extra=0):
+    with open(path, 'wb') as file:
+        file.write(header.pack(magic, _VERSION, count, extra))
+        file.truncate(header.size + _capacity(count) * item.size)
+
+
+# ------------------ Binary Score Store ------------------ #
+class BinaryScoreStore:
+    """Scores in a memory-mapped file of fixed-width records.
+
+    Opening a store maps both files and parses nothing; looking a student up
+    is a binary search over the mapped index, and changing one score rewrites
+    16 bytes in place. Scores come back as ``float``.
+    """
+
+    def __init__(self, path=BINARY_FILE):
+        self.path = path
+        self._bin_file = open(path, 'r+b')
+        self._idx_file = open(path + INDEX_SUFFIX, 'r+b')
+        self._bin = mmap.mmap(self._bin_file.fileno(), 0)
+        self._idx = mmap.mmap(self._idx_file.fileno(), 0)
+        magic, version, self._slots, self._live = _BIN_HEADER.unpack_from(self._bin, 0)
+        idx_magic, idx_version, self._entries, self._sorted = _IDX_HEADER.unpack_from(self._idx, 0)
+        if (magic, idx_magic) != (_BIN_MAGIC, _IDX_MAGIC) or (version, idx_version) != (_VERSION, _VERSION):
+            self.close()
+            raise ValueError(f"{path} is not a binary score store")
+
+    @classmethod
+    def create(cls, path=BINARY_FILE, data=()):
+        """Write a new store holding ``data`` (a mapping or ``(name, score)`` pairs).
+
+        Every name and score is checked before either file is touched; if
+        writing fails anyway, the half-written files are removed.
+        """
+        items = data.items() if hasattr(data, 'items') else data
+        scores = {}
+        for name, score in items:
+            scores[name] = float(score)
+        entries = sorted((_encode(name), slot) for slot, name in enumerate(scores))
+        store = None
+        try:
+            _create(path, _BIN_MAGIC, _BIN_HEADER, _RECORD, len(scores), len(scores))
+            _create(path + INDEX_SUFFIX, _IDX_MAGIC, _IDX_HEADER, _ENTRY, len(scores), len(scores))
+            store = cls(path)
+            for slot, score in enumerate(scores.values()):
+                _RECORD.pack_into(store._bin, _BIN_HEADER.size + slot * _RECORD.size, score, 1)
+            for i, (raw, slot) in enumerate(entries):
+                _ENTRY.pack_into(store._idx, _IDX_HEADER.size + i * _ENTRY.size, raw, slot)
+        except BaseException:
+            if store is not None:
+                store.close()
+            for name in (path, path + INDEX_SUFFIX):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(name)
+            raise
+        return store
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for mapped in (self._bin, self._idx):
+            if not mapped.closed:
+                mapped.flush()
+                mapped.close()
+        self._bin_file.close()
+        self._idx_file.close()
+
+    def flush(self):
+        self._bin.flush()
+        self._idx.flush()
+
+    # ---- lookups ---- #
+    def _entry(self, i):
+        return _ENTRY.unpack_from(self._idx, _IDX_HEADER.size + i * _ENTRY.size)
+
+    def _find(self, name):
+        """Index position and slot of ``name``, or ``(None, None)``."""
+        raw = _encode(name)
+        lo, hi = 0, self._sorted
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < raw:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._sorted:
+            found, slot = self._entry(lo)
+            if found == raw:
+                return lo, slot
+        for i in range(self._sorted, self._entries):
+            found, slot = self._entry(i)
+            if found == raw:
+                return i, slot
+        return None, None
+
+    def _record(self, slot):
+        return _RECORD.unpack_from(self._bin, _BIN_HEADER.size + slot * _RECORD.size)
+
+    def __len__(self):
+        return self._live
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __getitem__(self, name):
+        score = self.get(name)
+        if score is None:
+            raise KeyError(name)
+        return score
+
+    def get(self, name, default=None):
+        try:
+            _, slot = self._find(name)
+        except ValueError:
+            return default
+        if slot is None:
+            return default
+        score, live = self._record(slot)
+        return score if live else default
+
+    def items(self):
+        for i in range(self._entries):
+            raw, slot = self._entry(i)
+            score, live = self._record(slot)
+            if live:
+                yield raw.rstrip(b'\0').decode('utf-8'), score
+
+    def keys(self):
+        return (name for name, _ in self.items())
+
+    def values(self):
+        return (score for _, score in self.items())
+
+    def __iter__(self):
+        return self.keys()
+
+    # ---- updates ---- #
+    def __setitem__(self, name, score):
+        _, slot = self._find(name)
+        if slot is None:
+            raw = _encode(name)
+            slot = self._slots
+            self._bin = self._grow(self._bin, self._bin_file, _BIN_HEADER.size, _RECORD.size, slot + 1)
+            self._slots += 1
+            entry = self._entries
+            self._idx = self._grow(self._idx, self._idx_file, _IDX_HEADER.size, _ENTRY.size, entry + 1)
+            _ENTRY.pack_into(self._idx, _IDX_HEADER.size + entry * _ENTRY.size, raw, slot)
+            self._entries += 1
+            _IDX_HEADER.pack_into(self._idx, 0, _IDX_MAGIC, _VERSION, self._entries, self._sorted)
+        elif self._record(slot)[1]:
+            _RECORD.pack_into(self._bin, _BIN_HEADER.size + slot * _RECORD.size, score, 1)
+            return
+        _RECORD.pack_into(self._bin, _BIN_HEADER.size + slot * _RECORD.size, score, 1)
+        self._live += 1
+        self._write_bin_header()
+        if self._entries - self._sorted > TAIL_LIMIT:
+            self.compact_index()
+
+    def __delitem__(self, name):
+        _, slot = self._find(name)
+        if slot is None or not self._record(slot)[1]:
+            raise KeyError(name)
+        _RECORD.pack_into(self._bin, _BIN_HEADER.size + slot * _RECORD.size, 0.0, 0)
+        self._live -= 1
+        self._write_bin_header()
+
+    def pop(self, name, *default):
+        if name not in self:
+            if default:
+                return default[0]
+            raise KeyError(name)
+        score = self[name]
+        del self[name]
+        return score
+
+    def clear(self):
+        for slot in range(self._slots):
+            _RECORD.pack_into(self._bin, _BIN_HEADER.size + slot * _RECORD.size, 0.0, 0)
+        self._live = 0
+        self._write_bin_header()
+
+    def apply(self, records):
+        """Apply journal-style records (see student_store); all names are checked first."""
+        for record in records:
+            if record[0] == "U":
+                _encode(record[1])
+        for record in records:
+            if record[0] == "U":
+                self[record[1]] = float(record[2])
+            elif record[0] == "D":
+                self.pop(record[1], None)
+            elif record[0] == "C":
+                self.clear()
+
+    def compact_index(self):
+        """Merge the unsorted tail of the index back into sorted order."""
+        entries = sorted(self._entry(i) for i in range(self._entries))
+        for i, (raw, slot) in enumerate(entries):
+            _ENTRY.pack_into(self._idx, _IDX_HEADER.size + i * _ENTRY.size, raw, slot)
+        self._sorted = self._entries
+        _IDX_HEADER.pack_into(self._idx, 0, _IDX_MAGIC, _VERSION, self._entries, self._sorted)
+
+    def _write_bin_header(self):
+        _BIN_HEADER.pack_into(self._bin, 0, _BIN_MAGIC, _VERSION, self._slots, self._live)
+
+    @staticmethod
+    def _grow(mapped, file, header_size, item_size, count):
+        needed = header_size + count * item_size
+        if needed <= len(mapped):
+            return mapped
+        size = header_size + _capacity(count) * item_size
+        mapped.flush()
+        mapped.close()
+        file.truncate(size)
+        return mmap.mmap(file.fileno(), 0)
+
+
+# ------------------ Backend hooks for student_store ------------------ #
+# A store path ending in .bin is read into a StudentStore (so the menus,
+# batch mode and server get their usual indexes) and saved back as in-place
+# record updates.
+def open_students(path=BINARY_FILE):
+    with BinaryScoreStore(path) as store:
+        students = StudentStore((name, _whole(score)) for name, score in store.items())
+    students._source = path
+    return students
+
+
+def commit_students(students, path):
+    return False        # nothing is held open; StudentStore changes go through apply_changes()
+
+
+def apply_changes(path, records):
+    with BinaryScoreStore(path) as store:
+        store.apply(records)
+
+
+def write_scores(path, items):
+    BinaryScoreStore.create(path, items).close()
+
+
+# ------------------ Conversion ------------------ #
+def csv_to_binary(csv_path=SCORES_FILE, bin_path=BINARY_FILE):
+    """Build a binary store from a CSV snapshot and its journal."""
+    data = dict(iter_score_rows(csv_path))
+    replay_journal(data, journal_path(csv_path))
+    BinaryScoreStore.create(bin_path, data).close()
+    return len(data)
+
+
+def binary_to_csv(bin_path=BINARY_FILE, csv_path=SCORES_FILE):
+    """Write the ``name,score`` CSV layout from a binary store; whole scores stay whole."""
+    count = 0
+    with BinaryScoreStore(bin_path) as store, open(csv_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        for name, score in store.items():
+            writer.writerow([name, _whole(score)])
+            count += 1
+    try:
+        os.remove(journal_path(csv_path))
+    except FileNotFoundError:
+        pass
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert between students_score.csv and the binary score store.")
+    parser.add_argument("direction", choices=["import", "export"],
+                        help="import: CSV -> binary, export: binary -> CSV")
+    parser.add_argument("--csv", default=SCORES_FILE)
+    parser.add_argument("--bin", default=BINARY_FILE)
+    args = parser.parse_args(argv)
+    if args.direction == "import":
+        count = csv_to_binary(args.csv, args.bin)
+        print(f"Imported {count} students into {args.bin}")
+    else:
+        count = binary_to_csv(args.bin, args.csv)
+        print(f"Exported {count} students to {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
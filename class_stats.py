@@ -0,0 +1,154 @@
+import heapq
+from bisect import bisect_right
+from collections import Counter
+
+from quantile_sketch import KLLSketch
+
+HISTOGRAM_BINS = (0, 50, 70, 90)
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+# ------------------ Class Statistics ------------------ #
+def histogram_bin(score):
+    """Lower edge of the histogram bin ``score`` falls in (below 50 counts as 0+)."""
+    return HISTOGRAM_BINS[max(bisect_right(HISTOGRAM_BINS, score) - 1, 0)]
+
+
+class ClassStats:
+    """Count, total, highest, lowest and histogram bins, kept current as scores change.
+
+    Scores are held as a counted multiset so removing the current highest or
+    lowest student is still correct: the min/max heaps are pruned lazily of
+    scores whose count has dropped to zero. When attached to a store with
+    ``rebuild()`` the first pass is deferred until the stats are first read.
+    Percentiles come from a KLL sketch fed from the counted scores on first
+    use; it is updated as scores are added and re-fed after a removal.
+    """
+
+    def __init__(self, scores=()):
+        self._data = None
+        self.rebuild_scores(scores)
+
+    @classmethod
+    def from_scores(cls, scores):
+        return cls(scores)
+
+    def rebuild(self, data):
+        self._data = data
+        self._stale = True
+
+    def _ensure(self):
+        if self._stale:
+            self.rebuild_scores(self._data.values())
+
+    def rebuild_scores(self, scores):
+        """Recompute everything from one counting pass over ``scores``."""
+        counts = Counter(scores)
+        bins = dict.fromkeys(HISTOGRAM_BINS, 0)
+        total = 0
+        for score, count in counts.items():
+            bins[histogram_bin(score)] += count
+            total += score * count
+        self._counts = counts
+        self._bins = bins
+        self._total = total
+        self._count = sum(counts.values())
+        self._sketch = None
+        self._stale = False
+        self._prune_heaps()
+
+    def add(self, name, score):
+        if self._stale:
+            return
+        if not self._counts[score]:
+            if len(self._low) > 2 * len(self._counts) + 16:
+                self._prune_heaps()
+            heapq.heappush(self._low, score)
+            heapq.heappush(self._high, -score)
+        self._counts[score] += 1
+        self._bins[histogram_bin(score)] += 1
+        self._total += score
+        self._count += 1
+        if self._sketch is not None:
+            self._sketch.update(score)
+
+    def remove(self, name, score):
+        if self._stale:
+            return
+        self._counts[score] -= 1
+        if not self._counts[score]:
+            del self._counts[score]
+        self._bins[histogram_bin(score)] -= 1
+        self._total -= score
+        self._count -= 1
+        self._sketch = None     # sketches can't forget a score; re-feed on the next query
+
+    def _prune_heaps(self):
+        self._low = list(self._counts)
+        heapq.heapify(self._low)
+        self._high = [-score for score in self._counts]
+        heapq.heapify(self._high)
+
+    def clear(self):
+        self.rebuild_scores(())
+
+    @property
+    def counts(self):
+        self._ensure()
+        return self._counts
+
+    @property
+    def bins(self):
+        self._ensure()
+        return self._bins
+
+    @property
+    def total(self):
+        self._ensure()
+        return self._total
+
+    @property
+    def count(self):
+        self._ensure()
+        return self._count
+
+    @property
+    def highest(self):
+        self._ensure()
+        while self._high and -self._high[0] not in self._counts:
+            heapq.heappop(self._high)
+        return -self._high[0] if self._high else None
+
+    @property
+    def lowest(self):
+        self._ensure()
+        while self._low and self._low[0] not in self._counts:
+            heapq.heappop(self._low)
+        return self._low[0] if self._low else None
+
+    @property
+    def average(self):
+        count = self.count
+        return self.total / count if count else 0
+
+    @property
+    def sketch(self):
+        """A KLLSketch of the current scores (mergeable with other classes' sketches)."""
+        self._ensure()
+        if self._sketch is None:
+            self._sketch = KLLSketch()
+            self._sketch.update_counts(self._counts)
+        return self._sketch
+
+    def percentile(self, pct):
+        """Approximate score at percentile ``pct`` (0-100), or None with no scores."""
+        return self.sketch.quantile(pct / 100)
+
+    def percentiles(self, pcts=PERCENTILES):
+        return dict(zip(pcts, self.sketch.quantiles([pct / 100 for pct in pcts])))
+
+
+def stats_for(data):
+    """The maintained stats of a StudentStore, or a one-pass summary of any other mapping."""
+    stats = getattr(data, "stats", None)
+    return stats if stats is not None else ClassStats.from_scores(data.values())
@@ -0,0 +1,146 @@
+import re
+import sys
+from functools import lru_cache
+
+# Standard atomic weights (IUPAC conventional/abridged values, g/mol); mass
+# numbers of the longest-lived isotope for elements with no stable one.
+ATOMIC_WEIGHTS = {
+    "H": 1.008, "He": 4.0026, "Li": 6.94, "Be": 9.0122, "B": 10.81, "C": 12.011,
+    "N": 14.007, "O": 15.999, "F": 18.998, "Ne": 20.180, "Na": 22.990, "Mg": 24.305,
+    "Al": 26.982, "Si": 28.085, "P": 30.974, "S": 32.06, "Cl": 35.45, "Ar": 39.95,
+    "K": 39.098, "Ca": 40.078, "Sc": 44.956, "Ti": 47.867, "V": 50.942, "Cr": 51.996,
+    "Mn": 54.938, "Fe": 55.845, "Co": 58.933, "Ni": 58.693, "Cu": 63.546, "Zn": 65.38,
+    "Ga": 69.723, "Ge": 72.630, "As": 74.922, "Se": 78.971, "Br": 79.904, "Kr": 83.798,
+    "Rb": 85.468, "Sr": 87.62, "Y": 88.906, "Zr": 91.224, "Nb": 92.906, "Mo": 95.95,
+    "Tc": 97, "Ru": 101.07, "Rh": 102.91, "Pd": 106.42, "Ag": 107.87, "Cd": 112.41,
+    "In": 114.82, "Sn": 118.71, "Sb": 121.76, "Te": 127.60, "I": 126.90, "Xe": 131.29,
+    "Cs": 132.91, "Ba": 137.33, "La": 138.91, "Ce": 140.12, "Pr": 140.91, "Nd": 144.24,
+    "Pm": 145, "Sm": 150.36, "Eu": 151.96, "Gd": 157.25, "Tb": 158.93, "Dy": 162.50,
+    "Ho": 164.93, "Er": 167.26, "Tm": 168.93, "Yb": 173.05, "Lu": 174.97, "Hf": 178.49,
+    "Ta": 180.95, "W": 183.84, "Re": 186.21, "Os": 190.23, "Ir": 192.22, "Pt": 195.08,
+    "Au": 196.97, "Hg": 200.59, "Tl": 204.38, "Pb": 207.2, "Bi": 208.98, "Po": 209,
+    "At": 210, "Rn": 222, "Fr": 223, "Ra": 226, "Ac": 227, "Th": 232.04,
+    "Pa": 231.04, "U": 238.03, "Np": 237, "Pu": 244, "Am": 243, "Cm": 247,
+    "Bk": 247, "Cf": 251, "Es": 252, "Fm": 257, "Md": 258, "No": 259,
+    "Lr": 266, "Rf": 267, "Db": 268, "Sg": 269, "Bh": 270, "Hs": 269,
+    "Mt": 278, "Ds": 281, "Rg": 282, "Cn": 285, "Nh": 286, "Fl": 289,
+    "Mc": 290, "Lv": 293, "Ts": 294, "Og": 294,
+}
+
+TOKEN = re.compile(r"([A-Z][a-z]?)|(\d+)|([(\[{])|([)\]}])|(\s+)|(.)")
+HYDRATE = re.compile(r"[.·•*]")        # CuSO4·5H2O, CuSO4.5H2O, CuSO4*5H2O
+CLOSING = {"(": ")", "[": "]", "{": "}"}
+
+
+class FormulaError(ValueError):
+    pass
+
+
+# ------------------ Parsing ------------------ #
+def _parse_part(part):
+    """Element counts of one hydrate-free part, e.g. ``Ca(OH)2`` or ``5H2O``."""
+    match = re.match(r"\s*(\d+)", part)
+    multiplier = int(match.group(1)) if match else 1
+    if multiplier == 0:
+        raise FormulaError(f"zero multiplier in {part.strip()!r}")
+    stack = [({}, None)]                 # (counts, expected closing bracket)
+    last = None                          # what a following number multiplies
+    for element, number, opening, closing, space, other in TOKEN.findall(part[match.end() if match else 0:]):
+        if element:
+            if element not in ATOMIC_WEIGHTS:
+                raise FormulaError(f"unknown element {element!r}")
+            counts = stack[-1][0]
+            counts[element] = counts.get(element, 0) + 1
+            last = {element: 1}
+        elif number:
+            if last is None:
+                raise FormulaError(f"count {number} does not follow an element or group")
+            if int(number) == 0:
+                raise FormulaError(f"zero count after {''.join(last) if len(last) == 1 else 'a group'}")
+            counts = stack[-1][0]
+            for name, count in last.items():
+                counts[name] += count * (int(number) - 1)
+            last = None
+        elif opening:
+            stack.append(({}, CLOSING[opening]))
+            last = None
+        elif closing:
+            group, expected = stack.pop() if len(stack) > 1 else ({}, None)
+            if closing != expected:
+                raise FormulaError(f"unbalanced {closing!r}")
+            counts = stack[-1][0]
+            for name, count in group.items():
+                counts[name] = counts.get(name, 0) + count
+            last = group
+        elif other:
+            raise FormulaError(f"unexpected {other!r}")
+    if len(stack) > 1:
+        raise FormulaError(f"missing {stack[-1][1]!r}")
+    return {name: count * multiplier for name, count in stack[0][0].items()}
+
+
+@lru_cache(maxsize=4096)
+def _parse(formula):
+    totals = {}
+    for part in HYDRATE.split(formula):
+        for name, count in _parse_part(part).items():
+            totals[name] = totals.get(name, 0) + count
+    if not totals:
+        raise FormulaError("empty formula")
+    return tuple(sorted(totals.items()))
+
+
+def parse_formula(formula):
+    """``{element: count}`` for a formula; groups, brackets and hydrates (``·5H2O``) are expanded.
+
+    Raises FormulaError (a ValueError) for unknown elements, zero counts or bad syntax.
+    Results are memoised, so repeat formulas cost a dictionary copy.
+    """
+    return dict(_parse(formula))
+
+
+# ------------------ Derived Properties ------------------ #
+@lru_cache(maxsize=4096)
+def molecular_weight(formula):
+    """Molecular weight in g/mol from the bundled atomic-weight table."""
+    return round(sum(ATOMIC_WEIGHTS[name] * count for name, count in _parse(formula)), 3)
+
+
+@lru_cache(maxsize=4096)
+def hill_formula(formula):
+    """Hill-order formula: C, then H, then the rest alphabetically (all alphabetical without carbon)."""
+    counts = dict(_parse(formula))
+    order = sorted(counts)
+    if "C" in counts:
+        order = ["C"] + (["H"] if "H" in counts else []) + [n for n in order if n not in ("C", "H")]
+    return "".join(name + (str(counts[name]) if counts[name] > 1 else "") for name in order)
+
+
+@lru_cache(maxsize=4096)
+def degree_of_unsaturation(formula):
+    """Rings plus pi bonds: C + 1 + (N - H - X) / 2.
+
+    Si counts as carbon, P and B as nitrogen, halogens as hydrogen; divalent
+    atoms (O, S, ...) don't change it. A half-integer means a radical or ion.
+    """
+    counts = dict(_parse(formula))
+    get = counts.get
+    tetravalent = get("C", 0) + get("Si", 0)
+    trivalent = get("N", 0) + get("P", 0) + get("B", 0)
+    monovalent = get("H", 0) + get("F", 0) + get("Cl", 0) + get("Br", 0) + get("I", 0)
+    value = tetravalent + 1 + (trivalent - monovalent) / 2
+    return int(value) if value == int(value) else value
+
+
+def main(argv=None):
+    for formula in (sys.argv[1:] if argv is None else argv):
+        try:
+            print(f"{formula}: {hill_formula(formula)}, {molecular_weight(formula)} g/mol, "
+                  f"DoU {degree_of_unsaturation(formula)}")
+        except FormulaError as e:
+            print(f"{formula}: {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+
+# Opt-in timing for the menu scripts. Off unless the script is run with
+# --metrics or STUDENT_METRICS=1, in which case every @instrumented function
+# records its calls, wall time and the bytes the process read from and wrote
+# to storage while it ran (not terminal or pipe I/O; reads served from the
+# page cache count as zero), and a summary is printed at exit (and written as JSON to
+# STUDENT_METRICS_FILE when set). STUDENT_PROFILE_OPTION=<menu choice> also
+# runs that one menu action under cProfile.
+METRICS_FILE = os.environ.get("STUDENT_METRICS_FILE") or None
+PROFILE_OPTION = os.environ.get("STUDENT_PROFILE_OPTION") or None
+PROFILE_TOP = 20
+
+_metrics = {}
+
+
+def enabled():
+    return "--metrics" in sys.argv or bool(os.environ.get("STUDENT_METRICS")) or bool(METRICS_FILE)
+
+
+def _io_counters():
+    """``(bytes read, bytes written)`` from and to storage by this process so far, where the OS reports it."""
+    try:
+        with open("/proc/self/io") as file:
+            fields = dict(line.split(": ") for line in file.read().splitlines())
+        return int(fields["read_bytes"]), int(fields["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _record(label, seconds, before, after):
+    entry = _metrics.setdefault(label, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                        "bytes_read": 0, "bytes_written": 0})
+    entry["calls"] += 1
+    entry["seconds"] += seconds
+    entry["max_seconds"] = max(entry["max_seconds"], seconds)
+    if before and after:
+        entry["bytes_read"] += after[0] - before[0]
+        entry["bytes_written"] += after[1] - before[1]
+
+
+@contextlib.contextmanager
+def measure(label):
+    """Record the block under ``label`` (does nothing unless instrumentation is on)."""
+    if not enabled():
+        yield
+        return
+    before = _io_counters()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(label, time.perf_counter() - start, before, _io_counters())
+
+
+def instrumented(func):
+    """Decorator: time every call of ``func``; returns ``func`` untouched when instrumentation is off."""
+    if not enabled():
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with measure(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextlib.contextmanager
+def action(choice):
+    """Wrap one menu action: timed as ``option <choice>``, profiled if it is PROFILE_OPTION."""
+    if PROFILE_OPTION is None or str(choice) != PROFILE_OPTION:
+        with measure(f"option {choice}"):
+            yield
+        return
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    with measure(f"option {choice}"):
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+    path = f"student_profile_option_{choice}.prof"
+    profiler.dump_stats(path)
+    print(f"\nProfile of option {choice} saved to {path}", file=sys.stderr)
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+
+def summary():
+    """The metrics recorded so far, ``{label: {calls, seconds, max_seconds, bytes_read, bytes_written}}``."""
+    return {label: dict(entry) for label, entry in _metrics.items()}
+
+
+def report(file=None):
+    """Print the summary table and write METRICS_FILE; registered at exit when enabled."""
+    if not _metrics:
+        return
+    file = file or sys.stderr
+    print("\nInstrumentation summary:", file=file)
+    print(f"  {'operation':<24}{'calls':>7}{'total ms':>12}{'max ms':>11}{'read KB':>10}{'written KB':>12}", file=file)
+    for label, entry in sorted(_metrics.items(), key=lambda item: -item[1]["seconds"]):
+        print(f"  {label:<24}{entry['calls']:>7}{entry['seconds'] * 1000:12.1f}{entry['max_seconds'] * 1000:11.1f}"
+              f"{entry['bytes_read'] / 1024:10.1f}{entry['bytes_written'] / 1024:12.1f}", file=file)
+    if METRICS_FILE:
+        with open(METRICS_FILE, "w") as out:
+            json.dump({"pid": os.getpid(), "argv": sys.argv, "metrics": summary()}, out, indent=1)
+
+
+if enabled():
+    atexit.register(report)
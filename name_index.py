@@ -0,0 +1,106 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+MIN_SIMILARITY = 0.3
+
+
+def normalise(name):
+    """Case- and word-order-insensitive key: ``"eze_Chiamaka"`` -> ``"chiamaka eze"``."""
+    return " ".join(sorted(part for part in re.split(r"[\s_]+", name.lower()) if part))
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ------------------ Name Index ------------------ #
+class NameIndex:
+    """Trigram index over student names for "did you mean" suggestions.
+
+    Candidates are found through the trigram posting lists and ranked by
+    Jaccard similarity, so a lookup only touches names sharing a trigram with
+    the query instead of comparing it against the whole roster. The index is
+    built on first use and then kept in step with the store.
+    """
+
+    def __init__(self, data=None):
+        self._data = data if data is not None else {}
+        self._built = False
+
+    def rebuild(self, data):
+        self._data = data
+        self._built = False
+
+    def _build(self):
+        self._postings = defaultdict(set)
+        self._sizes = {}
+        self._keys = defaultdict(set)
+        self._built = True
+        for name in self._data:
+            self._index(name)
+
+    def _index(self, name):
+        key = normalise(name)
+        grams = trigrams(key)
+        for gram in grams:
+            self._postings[gram].add(name)
+        self._sizes[name] = len(grams)
+        self._keys[key].add(name)
+
+    def add(self, name, score):
+        if self._built:
+            self._index(name)
+
+    def remove(self, name, score):
+        if not self._built:
+            return
+        key = normalise(name)
+        for gram in trigrams(key):
+            posting = self._postings[gram]
+            posting.discard(name)
+            if not posting:
+                del self._postings[gram]
+        del self._sizes[name]
+        self._keys[key].discard(name)
+        if not self._keys[key]:
+            del self._keys[key]
+
+    def clear(self):
+        self._built = False
+
+    def lookup(self, query):
+        """The stored name matching ``query`` up to case, separators and word order, or None."""
+        if not self._built:
+            self._build()
+        matches = self._keys.get(normalise(query))
+        return min(matches) if matches else None
+
+    def suggest(self, query, limit=5, min_similarity=MIN_SIMILARITY):
+        """Up to ``limit`` stored names most similar to ``query``, best first."""
+        if not self._built:
+            self._build()
+        # Prefix filtering: a name reaching ``min_similarity`` must share at
+        # least ``needed`` of the query's trigrams, so it must appear in one of
+        # the rarest ``len - needed + 1`` posting lists. Only those generate
+        # candidates; the common trigrams are just checked against them.
+        postings = self._postings
+        grams = sorted(trigrams(normalise(query)), key=lambda gram: len(postings.get(gram, ())))
+        needed = max(1, math.ceil(min_similarity * len(grams)))
+        prefix = len(grams) - needed + 1
+        shared = Counter()
+        for gram in grams[:prefix]:
+            shared.update(postings.get(gram, ()))
+        for gram in grams[prefix:]:
+            posting = postings.get(gram, ())
+            for name in shared:
+                if name in posting:
+                    shared[name] += 1
+        scored = []
+        for name, common in shared.items():
+            similarity = common / (len(grams) + self._sizes[name] - common)
+            if similarity >= min_similarity:
+                scored.append((-similarity, name))
+        scored.sort()
+        return [name for _, name in scored[:limit]]
@@ -0,0 +1,202 @@
+import argparse
+import heapq
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from class_stats import PERCENTILES, ClassStats
+from quantile_sketch import KLLSketch
+from report_card import DEFAULT_CLASS, DEFAULT_TERM, DEFAULT_YEAR
+from score_array import ScoreArray
+from student_store import StudentStore, load_store, save_store
+
+# ------------------ Layout ------------------ #
+# One score file per class per term per year:
+#   <root>/<year>/<term>/<class>.csv      e.g. scores/2024/Second_Term/SS2.csv
+# Each partition is an ordinary students_score.csv (snapshot + journal), so
+# everything in student_store works on it unchanged.
+PARTITION_ROOT = 'scores'
+TERMS = ["First Term", "Second Term", "Third Term"]
+PARTITION_SUFFIX = '.csv'
+
+
+def _dirname(label):
+    return str(label).replace(" ", "_")
+
+
+def _label(dirname):
+    return dirname.replace("_", " ")
+
+
+def partition_path(class_name, term, year, root=PARTITION_ROOT):
+    return os.path.join(root, _dirname(year), _dirname(term), _dirname(class_name) + PARTITION_SUFFIX)
+
+
+def _term_order(term):
+    return TERMS.index(term) if term in TERMS else len(TERMS)
+
+
+def _read_partition(path):
+    # Workers only read a partition, so they don't need StudentStore's indexes
+    return ScoreArray.load(path)
+
+
+# ------------------ Workers ------------------ #
+# Module-level so ProcessPoolExecutor can pickle them.
+def _summarise(path):
+    stats = ClassStats.from_scores(_read_partition(path).values())
+    return {"count": stats.count, "total": stats.total, "highest": stats.highest,
+            "lowest": stats.lowest, "average": stats.average, "bins": stats.bins,
+            "sketch": stats.sketch}
+
+
+def _top(job):
+    path, n = job
+    items = _read_partition(path).items()
+    if n is None:
+        return sorted(items, key=lambda x: x[1], reverse=True)
+    return heapq.nlargest(n, items, key=lambda x: x[1])
+
+
+# ------------------ Partitioned Store ------------------ #
+class PartitionedStore:
+    """Scores for a whole school, partitioned by year, term and class.
+
+    Queries take optional ``class_name``/``term``/``year`` filters and only
+    list the directories that can match (partition pruning). Cross-partition
+    aggregates read each partition in a separate worker process.
+    """
+
+    def __init__(self, root=PARTITION_ROOT, workers=None):
+        self.root = root
+        self.workers = workers
+
+    def open(self, class_name=DEFAULT_CLASS, term=DEFAULT_TERM, year=DEFAULT_YEAR):
+        """The StudentStore for one class/term/year (empty if it has no scores yet)."""
+        try:
+            return load_store(partition_path(class_name, term, year, self.root))
+        except FileNotFoundError:
+            return StudentStore()
+
+    def save(self, students, class_name=DEFAULT_CLASS, term=DEFAULT_TERM, year=DEFAULT_YEAR):
+        path = partition_path(class_name, term, year, self.root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save_store(students, path)
+
+    def partitions(self, class_name=None, term=None, year=None):
+        """``(class_name, term, year, path)`` for every partition matching the filters."""
+        found = []
+        for year_dir in self._children(self.root, year):
+            year_path = os.path.join(self.root, year_dir)
+            for term_dir in self._children(year_path, term):
+                term_path = os.path.join(year_path, term_dir)
+                if class_name is not None:
+                    names = [_dirname(class_name) + PARTITION_SUFFIX]
+                else:
+                    names = sorted(n for n in os.listdir(term_path) if n.endswith(PARTITION_SUFFIX))
+                for name in names:
+                    path = os.path.join(term_path, name)
+                    if os.path.isfile(path):
+                        found.append((_label(name[:-len(PARTITION_SUFFIX)]), _label(term_dir), year_dir, path))
+        found.sort(key=lambda p: (p[2], _term_order(p[1]), p[0]))
+        return found
+
+    @staticmethod
+    def _children(path, wanted):
+        if wanted is not None:
+            return [_dirname(wanted)] if os.path.isdir(os.path.join(path, _dirname(wanted))) else []
+        try:
+            return sorted(n for n in os.listdir(path) if os.path.isdir(os.path.join(path, n)))
+        except FileNotFoundError:
+            return []
+
+    def _map(self, func, jobs):
+        if len(jobs) <= 1 or self.workers == 1:
+            return list(map(func, jobs))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(func, jobs))
+
+    # ---- aggregates ---- #
+    def class_statistics(self, class_name=None, term=None, year=None):
+        """``{(class_name, term, year): stats}`` for each matching partition."""
+        parts = self.partitions(class_name, term, year)
+        summaries = self._map(_summarise, [p[3] for p in parts])
+        return {p[:3]: summary for p, summary in zip(parts, summaries)}
+
+    def school_ranking(self, n=None, class_name=None, term=None, year=None):
+        """``(name, score, class_name, term, year)`` across partitions, best first.
+
+        With ``n``, each worker only returns its own top ``n`` before merging.
+        """
+        parts = self.partitions(class_name, term, year)
+        tops = self._map(_top, [(p[3], n) for p in parts])
+        merged = heapq.merge(
+            *[[(name, score) + p[:3] for name, score in top] for p, top in zip(parts, tops)],
+            key=lambda x: x[1], reverse=True)
+        return list(merged) if n is None else [row for _, row in zip(range(n), merged)]
+
+    def percentiles(self, pcts=PERCENTILES, class_name=None, term=None, year=None):
+        """``{pct: score}`` across every matching partition, from their merged quantile sketches.
+
+        Each worker returns only its partition's sketch (a few hundred
+        scores), so memory stays bounded however many students there are.
+        """
+        merged = KLLSketch()
+        for stats in self.class_statistics(class_name, term, year).values():
+            merged.merge(stats["sketch"])
+        return dict(zip(pcts, merged.quantiles([pct / 100 for pct in pcts])))
+
+    def term_averages(self, class_name=None, year=None):
+        """``{(year, term): average}``, weighting each partition by its student count."""
+        totals = {}
+        for (_, term, part_year), stats in self.class_statistics(class_name, None, year).items():
+            count, total = totals.get((part_year, term), (0, 0))
+            totals[(part_year, term)] = (count + stats["count"], total + stats["total"])
+        keys = sorted(totals, key=lambda k: (k[0], _term_order(k[1])))
+        return {key: totals[key][1] / totals[key][0] if totals[key][0] else 0 for key in keys}
+
+
+# ------------------ Command Line ------------------ #
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query scores partitioned by class, term and year.")
+    parser.add_argument("--root", default=PARTITION_ROOT)
+    parser.add_argument("--workers", type=int, default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("stats", "ranking", "terms", "percentiles", "import"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--class", dest="class_name")
+        cmd.add_argument("--term")
+        cmd.add_argument("--year")
+        if name == "ranking":
+            cmd.add_argument("--top", type=int, default=10)
+        if name == "import":
+            cmd.add_argument("csv", help="an existing students_score.csv to copy into the partition")
+    args = parser.parse_args(argv)
+    store = PartitionedStore(args.root, args.workers)
+
+    if args.command == "import":
+        students = load_store(args.csv)
+        class_name = args.class_name or DEFAULT_CLASS
+        term, year = args.term or DEFAULT_TERM, args.year or DEFAULT_YEAR
+        store.save(StudentStore(students), class_name, term, year)
+        print(f"Imported {len(students)} students into {partition_path(class_name, term, year, args.root)}")
+    elif args.command == "stats":
+        for (class_name, term, year), stats in store.class_statistics(args.class_name, args.term, args.year).items():
+            print(f"{year} {term} {class_name}: {stats['count']} students, "
+                  f"highest {stats['highest']}, lowest {stats['lowest']}, average {stats['average']:.2f}, "
+                  f"median {stats['sketch'].quantile(0.5)}")
+    elif args.command == "percentiles":
+        for pct, score in store.percentiles(PERCENTILES, args.class_name, args.term, args.year).items():
+            print(f"P{pct}: {score}")
+    elif args.command == "ranking":
+        ranking = store.school_ranking(args.top, args.class_name, args.term, args.year)
+        for pos, (name, score, class_name, term, year) in enumerate(ranking, 1):
+            print(f"{pos}. {name} ({class_name}, {term} {year}): {score}")
+    elif args.command == "terms":
+        for (year, term), average in store.term_averages(args.class_name, args.year).items():
+            print(f"{year} {term}: {average:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+
+DETAIL_LIMIT = 60           # above this many students, draw the aggregated view
+EDGE_COUNT = 10             # students shown individually at each end of a large roster
+PERCENTILES = (10, 25, 50, 75, 90)
+BAND_COLORS = [(90, "green"), (70, "blue"), (50, "orange"), (float("-inf"), "red")]
+
+
+def band_color(score):
+    for threshold, color in BAND_COLORS:
+        if score >= threshold:
+            return color
+
+
+# ------------------ Figures ------------------ #
+# Figures are built with the object-oriented API (no pyplot), so rendering
+# never needs a display and never touches the global pyplot state.
+def build_figure(data, title="Student Performance Summary"):
+    """A Figure for ``data``: one bar per student when small, an aggregate otherwise."""
+    if len(data) <= DETAIL_LIMIT:
+        return _detail_figure(data, title)
+    return _aggregate_figure(data, title)
+
+
+def _barh(ax, names_scores, fontsize=9):
+    names = [name.replace("_", " ") for name, _ in names_scores]
+    scores = [score for _, score in names_scores]
+    bars = ax.barh(names, scores, color=[band_color(s) for s in scores])
+    for bar, score in zip(bars, scores):
+        ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
+                f'{score:.1f}', va='center', fontsize=fontsize)
+    ax.grid(axis='x', linestyle=':', linewidth=0.5)
+
+
+def _detail_figure(data, title):
+    names_scores = sorted(data.items(), key=lambda x: x[1])
+    fig = Figure(figsize=(12, max(6, len(names_scores) * 0.3)), layout="constrained")
+    ax = fig.add_subplot()
+    _barh(ax, names_scores)
+    avg_score = sum(s for _, s in names_scores) / len(names_scores)
+    ax.axvline(avg_score, color='purple', linestyle='--', linewidth=1.5, label=f'Class Avg: {avg_score:.2f}')
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Scores')
+    ax.set_ylabel('Students')
+    ax.legend()
+    return fig
+
+
+def _aggregate_figure(data, title):
+    """Score density, percentile bands and the top/bottom students; size is independent of roster size."""
+    names = list(data.keys())
+    scores = np.fromiter(data.values(), dtype=float, count=len(names))
+
+    fig = Figure(figsize=(12, 9), layout="constrained")
+    grid = fig.add_gridspec(2, 2, height_ratios=[3, 2])
+    ax = fig.add_subplot(grid[0, :])
+    counts, edges = np.histogram(scores, bins=min(100, max(10, int(np.ptp(scores)) or 1)))
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+           color=[band_color(mid) for mid in (edges[:-1] + edges[1:]) / 2])
+    for pct, value in zip(PERCENTILES, np.percentile(scores, PERCENTILES)):
+        ax.axvline(value, color='black', linestyle=':', linewidth=1)
+        ax.text(value, counts.max() * 1.02, f'P{pct}', ha='center', fontsize=8)
+    avg_score = scores.mean()
+    ax.axvline(avg_score, color='purple', linestyle='--', linewidth=1.5, label=f'Class Avg: {avg_score:.2f}')
+    ax.set_title(f'{title} ({len(scores):,} students)', fontsize=16)
+    ax.set_xlabel('Scores')
+    ax.set_ylabel('Students')
+    ax.legend()
+
+    k = min(EDGE_COUNT, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    bottom = np.argpartition(scores, k - 1)[:k]
+    limit = max(scores.max(), 0) * 1.15 or 1
+    for cell, picked, label in ((grid[1, 0], top, f'Top {k}'), (grid[1, 1], bottom, f'Bottom {k}')):
+        edge_ax = fig.add_subplot(cell)
+        _barh(edge_ax, sorted(((names[i], scores[i]) for i in picked), key=lambda x: x[1]), fontsize=8)
+        edge_ax.set_xlim(0, limit)
+        edge_ax.set_title(label)
+    return fig
+
+
+# ------------------ Rendering ------------------ #
+def render_summary(data, path, title="Student Performance Summary"):
+    """Render off-screen to ``path``; the extension (.png, .svg, .pdf) picks the format."""
+    fig = build_figure(data, title)
+    fig.savefig(path, dpi=100)
+    return path
+
+
+def _render_job(job):
+    return render_summary(*job)
+
+
+def render_many(jobs, workers=None):
+    """Render ``(data, path, title)`` jobs across worker processes; returns the paths written."""
+    jobs = list(jobs)
+    if len(jobs) <= 1 or workers == 1:
+        return [_render_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_job, jobs))
+
+
+def main(argv=None):
+    from partitions import PARTITION_ROOT, PartitionedStore
+
+    parser = argparse.ArgumentParser(description="Render performance summaries for every class partition.")
+    parser.add_argument("--root", default=PARTITION_ROOT)
+    parser.add_argument("--out-dir", default="charts")
+    parser.add_argument("--format", default="png", choices=["png", "svg", "pdf"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--class", dest="class_name")
+    parser.add_argument("--term")
+    parser.add_argument("--year")
+    args = parser.parse_args(argv)
+
+    store = PartitionedStore(args.root)
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = []
+    for class_name, term, year, _ in store.partitions(args.class_name, args.term, args.year):
+        students = dict(store.open(class_name, term, year))
+        if students:
+            stem = f"{year}_{term}_{class_name}".replace(" ", "_")
+            jobs.append((students, os.path.join(args.out_dir, f"{stem}.{args.format}"),
+                         f"{class_name} {term} {year}"))
+    for path in render_many(jobs, args.workers):
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit
+
+CACHE_FILE = os.environ.get("PUBCHEM_CACHE_FILE", "pubchem_cache.sqlite3")
+MAX_BYTES = 64 * 1024 * 1024        # least recently used entries go first past this size
+TTL = 30 * 24 * 3600                # PubChem records rarely change
+NEGATIVE_TTL = 24 * 3600            # "not found" answers are retried sooner
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key      TEXT PRIMARY KEY,
+    status   INTEGER NOT NULL,
+    body     BLOB NOT NULL,
+    size     INTEGER NOT NULL,
+    expires  REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def cache_key(url, params=None):
+    """The same key for the same request however it was spelled.
+
+    Scheme and host are lowercased, the path is re-quoted canonically and
+    query parameters (from the URL and ``params``) are sorted.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + sorted((params or {}).items())
+    path = quote(unquote(parts.path), safe="/,")
+    key = f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}"
+    return f"{key}?{urlencode(sorted(query))}" if query else key
+
+
+# ------------------ Response Cache ------------------ #
+class ResponseCache:
+    """HTTP responses kept in SQLite across runs, with per-entry expiry and an LRU size bound.
+
+    Successful bodies are kept for ``ttl`` seconds and "not found" answers
+    (negative entries) for ``negative_ttl``. Expired entries are not returned
+    by ``get`` but stay on disk until evicted, so ``get(..., allow_expired=True)``
+    can still answer while offline.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_BYTES, ttl=TTL, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # One connection shared by every thread, so statements are serialised here
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;" + SCHEMA)
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, key, allow_expired=False):
+        """``(status, body)`` for ``key``, or None when missing (or expired, unless allowed)."""
+        with self._lock:
+            row = self._conn.execute("SELECT status, body, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            status, body, expires = row
+            now = time.time()
+            if expires < now and not allow_expired:
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return status, bytes(body)
+
+    def put(self, key, status, body=b"", ttl=None):
+        """Store a response; 404s are negative entries kept for ``negative_ttl``."""
+        if ttl is None:
+            ttl = self.negative_ttl if status == 404 else self.ttl
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                                   (key, status, body, len(body), now + ttl, now))
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self.evict()
+
+    def evict(self, target=None):
+        """Drop least recently used entries until the cache is under ``target`` bytes (90% of max)."""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+            doomed = []
+            for key, size in rows:
+                if self._size <= target:
+                    break
+                doomed.append((key,))
+                self._size -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        return len(doomed)
+
+    def purge_expired(self):
+        with self._lock:
+            with self._conn:
+                removed = self._conn.execute("DELETE FROM responses WHERE expires < ?", (time.time(),)).rowcount
+            self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        return removed
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+        self._size = 0
+
+    def stats(self):
+        with self._lock:
+            count, negative, expired = self._conn.execute(
+                "SELECT COUNT(*), SUM(status = 404), SUM(expires < ?) FROM responses", (time.time(),)).fetchone()
+        return {"entries": count, "negative": negative or 0, "expired": expired or 0, "bytes": self._size}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the PubChem response cache.")
+    parser.add_argument("command", choices=["stats", "purge", "clear"])
+    parser.add_argument("--path", default=CACHE_FILE)
+    args = parser.parse_args(argv)
+    with ResponseCache(args.path) as cache:
+        if args.command == "stats":
+            for name, value in cache.stats().items():
+                print(f"{name}: {value}")
+        elif args.command == "purge":
+            print(f"Removed {cache.purge_expired()} expired entries")
+        else:
+            cache.clear()
+            print("Cache cleared")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import math
+import random
+from bisect import bisect_left
+
+DEFAULT_K = 200     # about 1% rank error; the error shrinks roughly as 1/k
+SHRINK = 2 / 3      # each lower level holds 2/3 of the level above it
+
+
+# ------------------ KLL Sketch ------------------ #
+class KLLSketch:
+    """Mergeable streaming quantile sketch (Karnin, Lang and Liberty).
+
+    Items live in a stack of compactors; level ``h`` items stand for ``2**h``
+    original scores. When the sketch is full the first over-capacity level is
+    sorted and every other item is promoted to the next level, so memory stays
+    O(k log(n/k)) however many scores are fed in. Sketches built separately
+    (per class, per partition, per worker process) merge into one with the
+    same error bound. The coin flips come from a seeded generator, so the same
+    input always gives the same answers.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.count = 0
+        self._levels = []
+        self._size = 0
+        self._capacity = 0
+        self._rng = random.Random(seed)
+        self._grow()
+
+    @classmethod
+    def for_error(cls, epsilon, seed=0):
+        """A sketch whose quantiles are within about ``epsilon`` of the true rank fraction."""
+        return cls(max(8, math.ceil(1.7 / epsilon)), seed)
+
+    def _level_capacity(self, h):
+        return int(math.ceil(SHRINK ** (len(self._levels) - h - 1) * self.k)) + 1
+
+    def _grow(self):
+        self._levels.append([])
+        self._capacity = sum(self._level_capacity(h) for h in range(len(self._levels)))
+
+    def __len__(self):
+        return self.count
+
+    def update(self, score, weight=1):
+        """Feed one score (``weight`` copies of it, split into power-of-two levels)."""
+        self.count += weight
+        h = 0
+        while weight:
+            if weight & 1:
+                while h >= len(self._levels):
+                    self._grow()
+                self._levels[h].append(score)
+                self._size += 1
+            weight >>= 1
+            h += 1
+        self._compress()
+
+    def extend(self, scores):
+        for score in scores:
+            self.update(score)
+
+    def update_counts(self, counts):
+        """Feed a ``score -> count`` mapping (e.g. ClassStats.counts) without expanding it."""
+        for score, count in counts.items():
+            self.update(score, count)
+
+    def _compress(self):
+        while self._size >= self._capacity:
+            for h, level in enumerate(self._levels):
+                if len(level) >= self._level_capacity(h):
+                    if h + 1 == len(self._levels):
+                        self._grow()
+                    level.sort()
+                    odd = level.pop() if len(level) % 2 else None
+                    self._levels[h + 1].extend(level[self._rng.random() < 0.5::2])
+                    self._levels[h] = [] if odd is None else [odd]
+                    self._size = sum(len(items) for items in self._levels)
+                    break
+
+    def merge(self, other):
+        """Fold ``other`` into this sketch (``other`` is left unchanged)."""
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for h, items in enumerate(other._levels):
+            self._levels[h].extend(items)
+        self.count += other.count
+        self._size = sum(len(items) for items in self._levels)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = sorted((score, 1 << h) for h, level in enumerate(self._levels) for score in level)
+        values, cumulative, total = [], [], 0
+        for score, weight in items:
+            total += weight
+            values.append(score)
+            cumulative.append(total)
+        return values, cumulative, total
+
+    def quantile(self, q):
+        """The score at rank fraction ``q`` (0 = lowest, 0.5 = median, 1 = highest), or None if empty."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        values, cumulative, total = self._weighted()
+        if not values:
+            return [None] * len(qs)
+        result = []
+        for q in qs:
+            i = bisect_left(cumulative, q * total)
+            result.append(values[min(i, len(values) - 1)])
+        return result
+
+    def rank(self, score):
+        """Approximate number of fed scores ``<= score``."""
+        return sum(len([s for s in level if s <= score]) << h for h, level in enumerate(self._levels))
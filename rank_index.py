@@ -0,0 +1,182 @@
+import heapq
+from bisect import bisect_left, bisect_right
+
+
+# ------------------ Rank Index ------------------ #
+class RankIndex:
+    """Students kept in descending score order so a rank lookup is a bisect, not a full sort.
+
+    Entries are stored as ``(-score, name)`` so the list is ascending for ``bisect``
+    while reading as highest-score-first. Ties are broken by name.
+    """
+
+    def __init__(self, data=None):
+        self._keys = []      # sorted (-score, name)
+        self._neg = []       # sorted -score, parallel to _keys
+        self._scores = {}
+        self._data = None
+        self._stale = False
+        if data:
+            self._build(data)
+
+    def __len__(self):
+        self._ensure()
+        return len(self._keys)
+
+    def __contains__(self, name):
+        self._ensure()
+        return name in self._scores
+
+    def __iter__(self):
+        self._ensure()
+        for neg, name in self._keys:
+            yield name, -neg
+
+    def rebuild(self, data):
+        """Re-index from ``data`` (kept by reference) on the next query; used for bulk loads."""
+        self._data = data
+        self._stale = True
+
+    def _ensure(self):
+        if self._stale:
+            self._build(self._data)
+
+    def _build(self, data):
+        self._scores = dict(data)
+        # Sort by name, then stably by score: the same order as (-score, name)
+        # without comparing a million tuples.
+        names = sorted(self._scores)
+        names.sort(key=self._scores.__getitem__, reverse=True)
+        self._keys = [(-self._scores[name], name) for name in names]
+        self._neg = [key[0] for key in self._keys]
+        self._stale = False
+
+    def add(self, name, score):
+        if self._stale:
+            return
+        if name in self._scores:
+            self.remove(name)
+        key = (-score, name)
+        i = bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self._neg.insert(i, -score)
+        self._scores[name] = score
+
+    def remove(self, name, score=None):
+        if self._stale:
+            return
+        score = self._scores.pop(name)
+        i = bisect_left(self._keys, (-score, name))
+        del self._keys[i]
+        del self._neg[i]
+
+    def clear(self):
+        self._keys.clear()
+        self._neg.clear()
+        self._scores.clear()
+        self._stale = False
+
+    def rank(self, name):
+        """Competition rank: 1 + the number of students with a strictly higher score."""
+        self._ensure()
+        return bisect_left(self._neg, -self._scores[name]) + 1
+
+    def ties(self, name):
+        """Number of other students sharing this student's score."""
+        self._ensure()
+        neg = -self._scores[name]
+        return bisect_right(self._neg, neg) - bisect_left(self._neg, neg) - 1
+
+    def position(self, name):
+        """1-based position in the ranking, ties ordered by name."""
+        self._ensure()
+        score = self._scores[name]
+        return bisect_left(self._keys, (-score, name)) + 1
+
+    def neighbours(self, name, k=1):
+        """Up to ``k`` students ranked directly above and below ``name``."""
+        self._ensure()
+        i = self.position(name) - 1
+        above = [(n, -neg) for neg, n in self._keys[max(0, i - k):i]]
+        below = [(n, -neg) for neg, n in self._keys[i + 1:i + 1 + k]]
+        return above, below
+
+    def at(self, position):
+        """The ``(name, score)`` at a 1-based ranking position."""
+        self._ensure()
+        neg, name = self._keys[position - 1]
+        return name, -neg
+
+    def top(self, k=10):
+        """The ``k`` highest ``(name, score)`` pairs, best first."""
+        self._ensure()
+        return [(name, -neg) for neg, name in self._keys[:max(k, 0)]]
+
+    def bottom(self, k=10):
+        """The ``k`` lowest ``(name, score)`` pairs, lowest first (the ranking read backwards)."""
+        self._ensure()
+        if k <= 0:
+            return []
+        return [(name, -neg) for neg, name in reversed(self._keys[-k:])]
+
+    def _below(self, i):
+        return len(self._neg) - bisect_right(self._neg, self._neg[i])
+
+    def percentile(self, name):
+        """Percentage of students scoring strictly lower than ``name``."""
+        self._ensure()
+        return 100 * (len(self._neg) - bisect_right(self._neg, -self._scores[name])) / len(self._neg)
+
+    def band(self, low, high=100):
+        """``(name, score)`` for students whose percentile is in ``[low, high)``, best first.
+
+        ``high=100`` includes the top student. The band is a contiguous slice
+        of the ranking, found with two binary searches.
+        """
+        self._ensure()
+        n = len(self._keys)
+        low_count, high_count = low * n / 100, high * n / 100
+
+        def first(predicate):
+            lo, hi = 0, n
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if predicate(mid):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            return lo
+
+        start = 0 if high >= 100 else first(lambda i: self._below(i) < high_count)
+        end = first(lambda i: self._below(i) < low_count)
+        return [(name, -neg) for neg, name in self._keys[start:end]]
+
+
+# ------------------ Selection ------------------ #
+# For any name -> score mapping: a StudentStore answers from its maintained
+# RankIndex (an SQLite store from its score index); a plain dict uses heap
+# selection (O(n log k)) rather than a sort.
+def _ranking(data):
+    return getattr(data, "ranking", None)
+
+
+def top_students(data, k=10):
+    """The ``k`` best ``(name, score)`` pairs in ranking order."""
+    ranking = _ranking(data)
+    if ranking is not None:
+        return ranking.top(k)
+    return heapq.nsmallest(k, data.items(), key=lambda item: (-item[1], item[0]))
+
+
+def bottom_students(data, k=10):
+    """The ``k`` lowest ``(name, score)`` pairs, lowest first."""
+    ranking = _ranking(data)
+    if ranking is not None:
+        return ranking.bottom(k)
+    return heapq.nlargest(k, data.items(), key=lambda item: (-item[1], item[0]))
+
+
+def percentile_band(data, low, high=100):
+    """Students whose percentile (share scoring lower) is in ``[low, high)``, best first."""
+    ranking = _ranking(data)
+    return (ranking if ranking is not None else RankIndex(data)).band(low, high)
@@ -0,0 +1,168 @@
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import time
+import warnings
+import zipfile
+
+# ------------------ Layout ------------------ #
+# One zip per class/term holding every report card:
+#   cards/<name>.csv   the same CSV generate_report_card() writes
+#   manifest.json      {"format": 1, "students": {name: {"member", "average",
+#                       "class", "term", "year"}}}
+# The zip central directory gives random access to any one card. Each card
+# also carries its own manifest entry as JSON in its zip member comment, which
+# lives in the central directory, so appending a card never rewrites the
+# manifest: a new archive gets manifest.json when first closed and compact()
+# rebuilds it. Readers start from manifest.json and apply the card comments
+# in order, so a re-graded student's latest card wins; compact() drops the
+# stale copies.
+MANIFEST = "manifest.json"
+FORMAT = 1
+CARDS = "cards/"
+
+
+def _member(name):
+    return f"{CARDS}{name}.csv"
+
+
+def _card_info(member, entry):
+    info = zipfile.ZipInfo(member, date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    info.comment = json.dumps({key: value for key, value in entry.items() if key != "member"}).encode()
+    return info
+
+
+class ReportCardArchive:
+    """Report cards for a whole class/term in one indexed zip file."""
+
+    def __init__(self, path, mode="r"):
+        if mode not in ("r", "w", "a"):
+            raise ValueError(f"mode must be 'r', 'w' or 'a', not {mode!r}")
+        if mode == "a" and not os.path.exists(path):
+            mode = "w"
+        self.path = path
+        self.mode = mode
+        self._zip = zipfile.ZipFile(path, mode, compression=zipfile.ZIP_DEFLATED)
+        self._changed = False
+        # name -> manifest entry; read on first use, so adding a card doesn't parse every other one
+        self._students = {} if mode == "w" else None
+
+    @property
+    def students(self):
+        if self._students is None:
+            students = {}
+            if MANIFEST in self._zip.NameToInfo:
+                students = json.loads(self._zip.read(MANIFEST))["students"]
+            for info in self._zip.infolist():
+                if info.filename.startswith(CARDS) and info.comment:
+                    entry = json.loads(info.comment)
+                    entry["member"] = info.filename
+                    students[info.filename[len(CARDS):-len(".csv")]] = entry
+            self._students = students
+        return self._students
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Appended cards are indexed by their own comments; only a new archive needs the manifest
+        if self._changed and self.mode == "w":
+            self._zip.writestr(MANIFEST, json.dumps({"format": FORMAT, "students": self.students}))
+        self._zip.close()
+
+    def __len__(self):
+        return len(self.students)
+
+    def __contains__(self, name):
+        return name in self.students
+
+    def names(self):
+        return sorted(self.students)
+
+    def add(self, name, rows, average=None, class_name=None, term=None, year=None):
+        """Store one student's report-card rows (as from ``report_card_rows()``)."""
+        buffer = io.StringIO(newline="")
+        csv.writer(buffer).writerows(rows)
+        entry = {"member": _member(name), "average": average,
+                 "class": class_name, "term": term, "year": year}
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)    # duplicate names when re-grading
+            self._zip.writestr(_card_info(entry["member"], entry), buffer.getvalue())
+        if self._students is not None:
+            self._students[name] = entry
+        self._changed = True
+
+    def open_card(self, name):
+        """A binary file object for one student's CSV, read straight from the zip."""
+        return self._zip.open(self.students[name]["member"])
+
+    def read(self, name):
+        """One student's report card as CSV rows."""
+        with self.open_card(name) as raw:
+            return list(csv.reader(io.TextIOWrapper(raw, encoding="utf-8", newline="")))
+
+    def export(self, out_dir=".", names=None):
+        """Write ``{name}.csv`` files, one card at a time; returns how many were written."""
+        os.makedirs(out_dir, exist_ok=True)
+        count = 0
+        for name in names if names is not None else self.names():
+            with self.open_card(name) as src, open(os.path.join(out_dir, f"{name}.csv"), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            count += 1
+        return count
+
+
+def compact(path):
+    """Rewrite ``path`` keeping only the latest card per student and one manifest."""
+    tmp = path + ".tmp"
+    with ReportCardArchive(path) as old, zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as new:
+        for name in old.names():
+            entry = old.students[name]
+            with old.open_card(name) as src, new.open(_card_info(entry["member"], entry), "w") as dst:
+                shutil.copyfileobj(src, dst)
+        new.writestr(MANIFEST, json.dumps({"format": FORMAT, "students": old.students}))
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and export a report-card archive.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("list", "show", "export", "compact"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("archive")
+        if name == "show":
+            cmd.add_argument("name")
+        if name == "export":
+            cmd.add_argument("names", nargs="*", help="students to export (default: all)")
+            cmd.add_argument("--out-dir", default=".")
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        compact(args.archive)
+        return 0
+    with ReportCardArchive(args.archive) as cards:
+        if args.command == "list":
+            for name in cards.names():
+                average = cards.students[name]["average"]
+                print(name if average is None else f"{name}: {average:.2f}")
+        elif args.command == "show":
+            if args.name not in cards:
+                print(f"{args.name} is not in {args.archive}")
+                return 1
+            csv.writer(sys.stdout).writerows(cards.read(args.name))
+        elif args.command == "export":
+            print(f"Exported {cards.export(args.out_dir, args.names or None)} report cards to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
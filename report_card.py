@@ -0,0 +1,155 @@
+import csv
+import os
+from array import array
+from bisect import bisect_right
+
+# ------------------ Constants ------------------ #
+ASSIGNMENT_SCORE = 5
+GRADE_THRESHOLDS = [
+    (30, "A", "Excellent"),
+    (25, "B", "Very Good"),
+    (20, "C", "Good"),
+    (15, "D", "Fair"),
+    (10, "E", "Pass"),
+    (0,  "F", "Fail")
+]
+MATH_SUBJECTS = ["Numbers/Algebra", "Geometry", "Further Math"]
+ENGLISH_SUBJECTS = ["Grammar", "Elocution/Oral", "Literary Writing", "Lexis & Structure"]
+SCIENCE_SUBJECTS = ["Chemistry", "Biology", "Physics", "Geography", "Data Processing"]
+ARTS_SUBJECTS = ["Economics", "Civic Education"]
+CORE_SUBJECTS = MATH_SUBJECTS + ENGLISH_SUBJECTS + SCIENCE_SUBJECTS + ARTS_SUBJECTS
+OPTIONAL_SUBJECT = "Agric Science"
+PRINCIPAL_REMARK = "Excellent performance, keep it up! Work on your weak areas."
+DEFAULT_CLASS = "SS2"
+DEFAULT_TERM = "Second Term"
+DEFAULT_YEAR = "2024"
+# Set to a .zip path to collect report cards in one archive (see report_archive.py)
+# instead of writing a {name}.csv file per student.
+REPORT_ARCHIVE = os.environ.get("REPORT_CARD_ARCHIVE") or None
+
+
+# ------------------ Grading ------------------ #
+def grade_subject(cat1, cat2):
+    assignment_score = ASSIGNMENT_SCORE * 2 + cat1
+    total = assignment_score + cat2
+    for threshold, grade, remark in GRADE_THRESHOLDS:
+        if total >= threshold:
+            break
+    return {
+        "cat1": cat1, "cat2": cat2, "assignment": assignment_score,
+        "total": total, "grade": grade, "remark": remark
+    }
+
+# ------------------ Bulk Grading ------------------ #
+GRADE_LETTERS = [grade for _, grade, _ in GRADE_THRESHOLDS]
+GRADE_REMARKS = [remark for _, _, remark in GRADE_THRESHOLDS]
+# Thresholds in ascending order, and the GRADE_THRESHOLDS row each one belongs to.
+_ASCENDING = sorted(range(len(GRADE_THRESHOLDS)), key=lambda i: GRADE_THRESHOLDS[i][0])
+_ASCENDING_THRESHOLDS = [GRADE_THRESHOLDS[i][0] for i in _ASCENDING]
+# grade_subject() falls through to the last row when no threshold matches (NaN, negatives).
+_FALLTHROUGH = len(GRADE_THRESHOLDS) - 1
+
+def grade_cohort(cat1, cat2):
+    """Grade whole arrays of CAT1/CAT2 scores in one call.
+
+    Returns a dict of equal-length arrays: ``assignment``, ``total``, and
+    ``grade``/``remark`` codes indexing ``GRADE_LETTERS``/``GRADE_REMARKS``
+    (one code per row of GRADE_THRESHOLDS, so both arrays are the same object).
+    Every element matches what ``grade_subject()`` gives for that pair.
+    Uses NumPy when installed, otherwise ``array('d')`` and ``bisect``.
+    """
+    try:
+        import numpy as np      # deferred: only bulk grading needs it
+    except ImportError:
+        np = None
+    if np is not None:
+        cat1 = np.asarray(cat1, dtype=float)
+        cat2 = np.asarray(cat2, dtype=float)
+        assignment = ASSIGNMENT_SCORE * 2 + cat1
+        total = assignment + cat2
+        slot = np.searchsorted(_ASCENDING_THRESHOLDS, total, side="right") - 1
+        codes = np.asarray(_ASCENDING, dtype=np.int8)[np.clip(slot, 0, None)]
+        codes[(slot < 0) | np.isnan(total)] = _FALLTHROUGH
+    else:
+        assignment = array('d', (ASSIGNMENT_SCORE * 2 + c for c in cat1))
+        total = array('d', (a + c for a, c in zip(assignment, cat2)))
+        codes = array('b', (_grade_code(t) for t in total))
+    return {"assignment": assignment, "total": total, "grade": codes, "remark": codes}
+
+def _grade_code(total):
+    slot = bisect_right(_ASCENDING_THRESHOLDS, total) - 1
+    if slot < 0 or total != total:
+        return _FALLTHROUGH
+    return _ASCENDING[slot]
+
+def calculate_average(scores):
+    return sum(scores) / len(scores) if scores else 0
+
+def section_subjects(scores):
+    """The (section, subjects) layout of a report card, in printed order."""
+    science_keys = SCIENCE_SUBJECTS + ([OPTIONAL_SUBJECT] if OPTIONAL_SUBJECT in scores else [])
+    return [
+        ("English", ENGLISH_SUBJECTS),
+        ("Mathematics", MATH_SUBJECTS),
+        ("Science", science_keys),
+        ("Arts", ARTS_SUBJECTS)
+    ]
+
+def overall_average(scores):
+    sections = dict(section_subjects(scores))
+    return calculate_average([
+        calculate_average([scores[sub]["total"] for sub in sections[section]])
+        for section in ("Mathematics", "English", "Science", "Arts")
+    ])
+
+
+# ------------------ Report Card ------------------ #
+def report_card_rows(name, scores, academic_remark, behavioral_remark,
+                     class_name=DEFAULT_CLASS, term=DEFAULT_TERM, year=DEFAULT_YEAR):
+    overall_avg = overall_average(scores)
+    rows = [
+        ["Name", name],
+        ["Class", class_name],
+        ["Term", term],
+        ["Year", year],
+        ["Academics(cognitive)","ASS", "CW" ,"CA1", "CA1 Total","CAT2", "Total", "Grade", "Remark"],
+    ]
+    for section, subject_list in section_subjects(scores):
+        rows.append([""])
+        rows.append([section])
+        for sub in subject_list:
+            s = scores[sub]
+            rows.append([sub, ASSIGNMENT_SCORE, ASSIGNMENT_SCORE, s["cat1"], s["assignment"], s["cat2"], s["total"], s["grade"], s["remark"]])
+        section_avg = calculate_average([scores[sub]["total"] for sub in subject_list])
+        rows.append(["", "", "", "", "", "CUM.A", section_avg])
+
+    rows.append([""])
+    rows.append([" ","Student's Overall Average(SOA):", f"{overall_avg:.2f}"])
+    rows.append([""])
+    rows.append(["Academic Remark", academic_remark])
+    rows.append(["Behavioral Remark", behavioral_remark])
+    rows.append(["Principal's Remark", PRINCIPAL_REMARK])
+    return rows
+
+def write_report_card(name, scores, academic_remark, behavioral_remark, filename=None,
+                      class_name=DEFAULT_CLASS, term=DEFAULT_TERM, year=DEFAULT_YEAR, archive=None):
+    """Write ``{name}.csv`` (or add it to the ``archive`` zip) and return the student's overall average.
+
+    ``archive`` is a zip path, or an open ReportCardArchive when adding many
+    cards in one run.
+    """
+    rows = report_card_rows(name, scores, academic_remark, behavioral_remark, class_name, term, year)
+    average = overall_average(scores)
+    if archive is not None:
+        from report_archive import ReportCardArchive
+
+        if isinstance(archive, ReportCardArchive):
+            archive.add(name, rows, average, class_name, term, year)
+            return average
+        with ReportCardArchive(archive, "a") as cards:
+            cards.add(name, rows, average, class_name, term, year)
+        return average
+    filename = filename or f"{name}.csv"
+    with open(filename, mode="w", newline="") as file:
+        csv.writer(file).writerows(rows)
+    return average
@@ -0,0 +1,199 @@
+from array import array
+from math import isnan, nan
+
+from student_store import SCORES_FILE, iter_score_rows, journal_path, replay_journal
+
+
+# ------------------ Array-backed Score Store ------------------ #
+MIN_SLOTS = 1024    # smallest hash table; it doubles whenever it gets half full
+PACK_MIN = 4096     # deleted rows are dropped once there are this many, or half the table
+
+
+class ScoreArray:
+    """Memory-compact ``name -> score`` mapping for very large rosters.
+
+    Names are packed end to end as UTF-8 in one ``bytearray`` with an
+    ``array('Q')`` of end offsets, scores sit in a parallel ``array('d')``,
+    and an open-addressing hash table of row numbers (``array('i')``) finds a
+    name's row: about the name's length plus 30 bytes a student, with no
+    per-row Python object. Rows keep insertion order. A deleted student's
+    score becomes NaN until enough rows are deleted to repack the table.
+    Whole-number scores come back as ``int``, others as ``float``.
+    """
+
+    def __init__(self, data=()):
+        self.clear()
+        self.update(data)
+
+    def update(self, data):
+        """Bulk insert, e.g. a streamed snapshot; later rows win over earlier ones.
+
+        Rows are appended to the packed arrays as they arrive and hashed into
+        the table in one pass at the end, resizing it at most once.
+        """
+        items = data.items() if hasattr(data, "items") else data
+        blob, offsets, scores = self._blob, self._offsets, self._scores
+        start = len(scores)
+        hashes = array('q')
+        for name, score in items:
+            key = name.encode()
+            blob += key
+            offsets.append(len(blob))
+            scores.append(score)
+            hashes.append(hash(key))
+        size = len(self._slots)
+        while size < 2 * len(scores):
+            size *= 2
+        if size > len(self._slots):
+            self._rehash(size, start)
+        slots, mask = self._slots, size - 1
+        for row in range(start, len(scores)):
+            h = hashes[row - start]
+            key = None
+            i = h & mask
+            while True:
+                other = slots[i]
+                if other < 0:
+                    break
+                if other < start or hashes[other - start] == h:
+                    if key is None:
+                        key = blob[offsets[row]:offsets[row + 1]]
+                    if blob[offsets[other]:offsets[other + 1]] == key:
+                        # a repeated name: the later row replaces the earlier
+                        if not isnan(scores[other]):
+                            scores[other] = nan
+                            self._deleted += 1
+                        break
+                i = (i + 1) & mask
+            slots[i] = row
+
+    @classmethod
+    def load(cls, path=SCORES_FILE):
+        """Stream the snapshot at ``path`` (plus its journal) into a new ScoreArray."""
+        store = cls(iter_score_rows(path))
+        replay_journal(store, journal_path(path))
+        return store
+
+    # ---- hash table ---- #
+    def _slot(self, key):
+        """Slot of the row holding ``key``, or the empty slot it would take."""
+        slots, blob, offsets = self._slots, self._blob, self._offsets
+        mask = len(slots) - 1
+        i = hash(key) & mask
+        while True:
+            row = slots[i]
+            if row < 0 or blob[offsets[row]:offsets[row + 1]] == key:
+                return i
+            i = (i + 1) & mask
+
+    def _find(self, name):
+        """Row of a live student ``name``, or -1."""
+        row = self._slots[self._slot(name.encode())]
+        return row if row >= 0 and not isnan(self._scores[row]) else -1
+
+    def _rehash(self, size, rows=None):
+        """A new table of ``size`` slots holding the first ``rows`` rows (all by default)."""
+        slots = array('i', [-1]) * size
+        mask = size - 1
+        blob, offsets = self._blob, self._offsets
+        for row in range(len(self._scores) if rows is None else rows):
+            i = hash(bytes(blob[offsets[row]:offsets[row + 1]])) & mask
+            while slots[i] >= 0:
+                i = (i + 1) & mask
+            slots[i] = row
+        self._slots = slots
+
+    def _pack(self):
+        """Drop deleted rows and rebuild the hash table."""
+        blob, offsets, scores = bytearray(), array('Q', [0]), array('d')
+        old_blob, old_offsets = self._blob, self._offsets
+        for row, score in enumerate(self._scores):
+            if not isnan(score):
+                blob += old_blob[old_offsets[row]:old_offsets[row + 1]]
+                offsets.append(len(blob))
+                scores.append(score)
+        self._blob, self._offsets, self._scores = blob, offsets, scores
+        self._deleted = 0
+        size = MIN_SLOTS
+        while size < 2 * len(scores):
+            size *= 2
+        self._rehash(size)
+
+    # ---- mapping ---- #
+    def __len__(self):
+        return len(self._scores) - self._deleted
+
+    def __contains__(self, name):
+        return self._find(name) >= 0
+
+    def __iter__(self):
+        for name, _ in self.items():
+            yield name
+
+    def __getitem__(self, name):
+        row = self._find(name)
+        if row < 0:
+            raise KeyError(name)
+        score = self._scores[row]
+        return int(score) if score.is_integer() else score
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __setitem__(self, name, score):
+        key = name.encode()
+        i = self._slot(key)
+        row = self._slots[i]
+        if row >= 0:
+            if isnan(self._scores[row]):
+                self._deleted -= 1
+            self._scores[row] = score
+            return
+        self._blob += key
+        self._offsets.append(len(self._blob))
+        self._scores.append(score)
+        self._slots[i] = len(self._scores) - 1
+        if 2 * len(self._scores) > len(self._slots):
+            self._rehash(2 * len(self._slots))
+
+    def __delitem__(self, name):
+        row = self._find(name)
+        if row < 0:
+            raise KeyError(name)
+        self._scores[row] = nan
+        self._deleted += 1
+        if self._deleted > max(PACK_MIN, len(self._scores) // 2):
+            self._pack()
+
+    def pop(self, name, *default):
+        if name not in self:
+            if default:
+                return default[0]
+            raise KeyError(name)
+        score = self[name]
+        del self[name]
+        return score
+
+    def clear(self):
+        self._blob = bytearray()
+        self._offsets = array('Q', [0])
+        self._scores = array('d')
+        self._slots = array('i', [-1]) * MIN_SLOTS
+        self._deleted = 0
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        return [score for _, score in self.items()]
+
+    def items(self):
+        blob, offsets, scores = self._blob, self._offsets, self._scores
+        for row in range(len(scores)):
+            score = scores[row]
+            if not isnan(score):
+                yield (blob[offsets[row]:offsets[row + 1]].decode(),
+                       int(score) if score.is_integer() else score)
@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import socket
+import sys
+
+from batch_commands import ARGUMENTS, BatchError, WRITES, execute, parse_line
+from student_store import SCORES_FILE, StudentStore, load_store, refresh_store, save_store, store_lock
+
+# ------------------ Protocol ------------------ #
+# One JSON object per line each way, over a Unix socket ("unix:/path") or
+# localhost TCP ("host:port"):
+#   -> {"op": "get", "name": "Soala_Amachree"}
+#   <- {"ok": true, "result": {"name": ..., "score": 97, "rank": 2, "ties": 0}}
+# Operations are the ones batch_commands understands (add, delete, get,
+# ranking, stats, names, report_card). The server keeps one StudentStore and
+# its rank/stats/name indexes in memory; writes are saved through save_store
+# as they happen, and changes saved by other processes are picked up every
+# REFRESH_SECONDS. Waiting for the store's file lock happens in a worker
+# thread, so a slow writer elsewhere doesn't hold up other clients' reads.
+#
+# The server is read-only unless started with --allow-writes (any client may
+# add, delete and write report cards) or given an admin password, in which
+# case a write must carry {"password": ...}; with the password, clear is
+# allowed too.
+DEFAULT_ADDRESS = os.environ.get("STUDENT_SERVER", "127.0.0.1:8765")
+ADMIN_PASSWORD = os.environ.get("STUDENT_ADMIN_PASSWORD") or None
+REFRESH_SECONDS = 2.0
+
+
+def parse_address(address):
+    """``("unix", path)`` or ``("tcp", (host, port))``."""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+# ------------------ Server ------------------ #
+class ScoreServer:
+    def __init__(self, path=SCORES_FILE, refresh=REFRESH_SECONDS, allow_writes=False, admin_password=None):
+        self.path = path
+        self.refresh = refresh
+        self.allow_writes = allow_writes
+        self.admin_password = admin_password
+        self._persisting = asyncio.Lock()
+        try:
+            self.students = load_store(path)
+        except FileNotFoundError:
+            self.students = StudentStore()
+
+    async def handle(self, request):
+        """The response for one decoded request."""
+        try:
+            if not isinstance(request, dict):
+                raise BatchError("request must be a JSON object")
+            op = request.pop("op", None)
+            if op not in ARGUMENTS:
+                raise BatchError(f"unknown operation {op!r}")
+            if op == "save":
+                raise BatchError(f"operation {op!r} is not available over the server")
+            if op in WRITES and not self._may_write(request.get("password")):
+                raise BatchError(f"operation {op!r} refused: the server is read-only")
+            result = execute(self.students, op, request, self.admin_password)
+            if op in WRITES:
+                await self._persist(lambda: save_store(self.students, self.path, locked=True))
+            return {"ok": True, "result": result}
+        except (BatchError, KeyError, OSError, TypeError, ValueError) as e:
+            return {"ok": False, "error": f"missing argument {e}" if isinstance(e, KeyError) else str(e)}
+
+    def _may_write(self, password):
+        if self.admin_password is not None and password == self.admin_password:
+            return True
+        return self.allow_writes
+
+    async def _persist(self, work, shared=False):
+        """Run ``work`` holding the store's file lock, one persistence step at a time.
+
+        Only the wait for the lock runs in a worker thread; ``work`` itself
+        runs on the event loop, so requests never see a half-merged store.
+        """
+        if not isinstance(self.students, StudentStore):
+            work()                      # database backends do their own locking
+            return
+        async with self._persisting:
+            lock = store_lock(self.path, shared)
+            acquire = asyncio.ensure_future(asyncio.to_thread(lock.__enter__))
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                acquire.add_done_callback(lambda done: done.exception() or lock.__exit__(None, None, None))
+                raise
+            try:
+                work()
+            finally:
+                lock.__exit__(None, None, None)
+
+    async def _client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:      # longer than the stream limit
+                    writer.write(json.dumps({"ok": False, "error": "request line too long"}).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"ok": False, "error": f"bad request: {e}"}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh)
+            try:
+                await self._persist(lambda: refresh_store(self.students, self.path, locked=True), shared=True)
+            except OSError as e:
+                print(f"Refreshing {self.path} failed: {e}", file=sys.stderr)
+
+    async def serve(self, address=DEFAULT_ADDRESS):
+        kind, where = parse_address(address)
+        if kind == "unix":
+            if os.path.exists(where):
+                os.remove(where)    # stale socket from a previous run
+            server = await asyncio.start_unix_server(self._client, path=where)
+        else:
+            server = await asyncio.start_server(self._client, *where)
+        print(f"Serving {len(self.students)} students from {self.path} on {address}", file=sys.stderr)
+        refresher = asyncio.create_task(self._refresh_loop()) if self.refresh else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if refresher:
+                refresher.cancel()
+
+
+# ------------------ Client ------------------ #
+class ScoreClient:
+    """A blocking client for one connection to a running score server."""
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=10):
+        kind, where = parse_address(address)
+        family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(where)
+        self._file = self._sock.makefile("rwb")
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, op, **args):
+        """Send one operation and return the decoded response (``{"ok": ..., ...}``)."""
+        self._file.write(json.dumps(dict(args, op=op)).encode() + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("score server closed the connection")
+        return json.loads(line)
+
+
+def run_client(address, lines, password=None):
+    """Send batch-style command lines to the server and print each response.
+
+    ``password`` is sent with every write, for servers started with an admin password.
+    """
+    failures = 0
+    with ScoreClient(address) as client:
+        for line in lines:
+            try:
+                parsed = parse_line(line)
+            except (BatchError, ValueError) as e:
+                print(json.dumps({"ok": False, "error": str(e)}))
+                failures += 1
+                continue
+            if parsed is None:
+                continue
+            op, args = parsed
+            if password is not None and op in WRITES:
+                args.setdefault("password", password)
+            response = client.request(op, **args)
+            failures += not response["ok"]
+            print(json.dumps(response))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve or query the student store over a local socket.")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="host:port or unix:/path/to/socket")
+    parser.add_argument("--password", default=ADMIN_PASSWORD,
+                        help="admin password: required by the server for writes, sent by clients with them")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--scores-file", default=SCORES_FILE)
+    serve.add_argument("--refresh", type=float, default=REFRESH_SECONDS,
+                       help="seconds between checks for other processes' saves (0 to disable)")
+    serve.add_argument("--allow-writes", action="store_true",
+                       help="let any local client add, delete and write report cards without the password")
+    query = sub.add_parser("query", help="send one command, e.g.: query get Soala_Amachree")
+    query.add_argument("words", nargs="+")
+    sub.add_parser("shell", help="read commands from stdin, one per line")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            server = ScoreServer(args.scores_file, args.refresh, args.allow_writes, args.password)
+            asyncio.run(server.serve(args.address))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.command == "query":
+        return 1 if run_client(args.address, [shlex.join(args.words)], args.password) else 0
+    return 1 if run_client(args.address, sys.stdin, args.password) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+import argparse
+import csv
+import math
+import os
+import sqlite3
+import sys
+from collections.abc import MutableMapping
+
+from class_stats import HISTOGRAM_BINS, PERCENTILES
+from name_index import NameIndex
+from student_store import iter_score_rows, journal_path, replay_journal
+
+DB_FILE = 'students_score.db'
+
+# NUMERIC affinity keeps whole scores as INTEGER and report-card averages as REAL.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    name  TEXT PRIMARY KEY,
+    score NUMERIC NOT NULL
+);
+CREATE INDEX IF NOT EXISTS students_by_score ON students (score, name);
+"""
+
+
+# ------------------ SQLite Score Store ------------------ #
+class SqliteScoreStore:
+    """Scores in an SQLite table indexed on score and name.
+
+    Rank, top-N, histogram and min/max are answered by indexed queries, so
+    callers that only need those never load the roster into a dict.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # ---- lookups ---- #
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def get(self, name, default=None):
+        row = self.conn.execute("SELECT score FROM students WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def items(self):
+        return self.conn.execute("SELECT name, score FROM students")
+
+    def rank(self, name):
+        """Competition rank of ``name`` (None if unknown), counted on the score index."""
+        score = self.get(name)
+        if score is None:
+            return None
+        return self.conn.execute(
+            "SELECT COUNT(*) + 1 FROM students WHERE score > ?", (score,)).fetchone()[0]
+
+    def top(self, n=10):
+        return self.conn.execute(
+            "SELECT name, score FROM students ORDER BY score DESC, name LIMIT ?", (n,)).fetchall()
+
+    def bottom(self, n=10):
+        """The ``n`` lowest, lowest first (the top-N order read backwards, as RankIndex.bottom)."""
+        return self.conn.execute(
+            "SELECT name, score FROM students ORDER BY score, name DESC LIMIT ?", (n,)).fetchall()
+
+    def ties(self, name):
+        score = self.get(name)
+        if score is None:
+            return None
+        return self.conn.execute("SELECT COUNT(*) - 1 FROM students WHERE score = ?", (score,)).fetchone()[0]
+
+    def below(self, score):
+        """Number of students scoring strictly lower than ``score``."""
+        return self.conn.execute("SELECT COUNT(*) FROM students WHERE score < ?", (score,)).fetchone()[0]
+
+    def band(self, low, high=100):
+        """``(name, score)`` whose percentile (share scoring lower) is in ``[low, high)``, best first."""
+        n = len(self)
+        return self.conn.execute(
+            "SELECT name, score FROM (SELECT name, score, RANK() OVER (ORDER BY score) - 1 AS below "
+            "FROM students) WHERE below >= ? AND (? OR below < ?) ORDER BY score DESC, name",
+            (low * n / 100, high >= 100, high * n / 100)).fetchall()
+
+    def quantile(self, q):
+        """The score at rank fraction ``q`` (0 = lowest, 1 = highest), read off the score index."""
+        n = len(self)
+        if not n:
+            return None
+        offset = min(max(math.ceil(q * n) - 1, 0), n - 1)
+        return self.conn.execute(
+            "SELECT score FROM students ORDER BY score LIMIT 1 OFFSET ?", (offset,)).fetchone()[0]
+
+    def histogram(self):
+        """Student counts per HISTOGRAM_BINS bin, each an indexed range count."""
+        bins = {}
+        edges = list(HISTOGRAM_BINS[1:]) + [None]
+        for i, (low, high) in enumerate(zip(HISTOGRAM_BINS, edges)):
+            where, args = [], []
+            if i > 0:
+                where.append("score >= ?")
+                args.append(low)
+            if high is not None:
+                where.append("score < ?")
+                args.append(high)
+            sql = "SELECT COUNT(*) FROM students" + (" WHERE " + " AND ".join(where) if where else "")
+            bins[low] = self.conn.execute(sql, args).fetchone()[0]
+        return bins
+
+    def statistics(self):
+        count, highest, lowest, average = self.conn.execute(
+            "SELECT COUNT(*), MAX(score), MIN(score), AVG(score) FROM students").fetchone()
+        return {"count": count, "highest": highest, "lowest": lowest, "average": average or 0}
+
+    # ---- updates ---- #
+    def upsert(self, name, score):
+        with self.conn:
+            self._upsert(name, score)
+
+    def _upsert(self, name, score):
+        self.conn.execute(
+            "INSERT INTO students (name, score) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET score = excluded.score", (name, score))
+
+    def delete(self, name):
+        with self.conn:
+            self.conn.execute("DELETE FROM students WHERE name = ?", (name,))
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM students")
+
+    def apply(self, records):
+        """Apply journal-style records (see student_store) in one transaction."""
+        with self.conn:
+            for record in records:
+                if record[0] == "U":
+                    self._upsert(record[1], record[2])
+                elif record[0] == "D":
+                    self.conn.execute("DELETE FROM students WHERE name = ?", (record[1],))
+                elif record[0] == "C":
+                    self.conn.execute("DELETE FROM students")
+
+    def replace_all(self, items):
+        with self.conn:
+            self.conn.execute("DELETE FROM students")
+            self.conn.executemany("INSERT OR REPLACE INTO students (name, score) VALUES (?, ?)", items)
+
+
+# ------------------ Query-backed Student Store ------------------ #
+# What load_store() returns for an SQLite path: the same dict interface and
+# ranking/stats/names attributes as a StudentStore, answered by the indexed
+# queries above instead of a copy of the table in memory.
+class SqliteRanking:
+    """The RankIndex queries the menus and batch commands use, on the score index."""
+
+    def __init__(self, db):
+        self._db = db
+
+    def rank(self, name):
+        rank = self._db.rank(name)
+        if rank is None:
+            raise KeyError(name)
+        return rank
+
+    def ties(self, name):
+        ties = self._db.ties(name)
+        if ties is None:
+            raise KeyError(name)
+        return ties
+
+    def top(self, k=10):
+        return self._db.top(max(k, 0))
+
+    def bottom(self, k=10):
+        return self._db.bottom(max(k, 0))
+
+    def percentile(self, name):
+        score = self._db.get(name)
+        if score is None:
+            raise KeyError(name)
+        return 100 * self._db.below(score) / len(self._db)
+
+    def band(self, low, high=100):
+        return self._db.band(low, high)
+
+
+class SqliteStats:
+    """ClassStats' summary properties as aggregate queries; percentiles are exact."""
+
+    def __init__(self, db):
+        self._db = db
+
+    @property
+    def count(self):
+        return len(self._db)
+
+    def _value(self, sql):
+        return self._db.conn.execute(sql).fetchone()[0]
+
+    @property
+    def total(self):
+        return self._value("SELECT COALESCE(SUM(score), 0) FROM students")
+
+    @property
+    def highest(self):
+        return self._value("SELECT MAX(score) FROM students")    # one step down the score index
+
+    @property
+    def lowest(self):
+        return self._value("SELECT MIN(score) FROM students")
+
+    @property
+    def average(self):
+        return self._value("SELECT COALESCE(AVG(score), 0) FROM students")
+
+    @property
+    def bins(self):
+        return self._db.histogram()
+
+    def percentile(self, pct):
+        return self._db.quantile(pct / 100)
+
+    def percentiles(self, pcts=PERCENTILES):
+        return {pct: self.percentile(pct) for pct in pcts}
+
+
+class SqliteStudents(MutableMapping):
+    """``name -> score`` over an SQLite store without loading it.
+
+    Changes go into an open transaction on this connection (so reads here see
+    them at once) and are committed by ``save_store()``, like the pending
+    changes of a StudentStore. ``names`` builds its trigram index from the
+    name column the first time a suggestion is asked for.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.db = SqliteScoreStore(path)
+        self.ranking = SqliteRanking(self.db)
+        self.stats = SqliteStats(self.db)
+        self.names = NameIndex(self)
+
+    def close(self):
+        self.db.close()
+
+    def commit(self):
+        self.db.conn.commit()
+
+    def __len__(self):
+        return len(self.db)
+
+    def __contains__(self, name):
+        return self.db.get(name) is not None
+
+    def __getitem__(self, name):
+        score = self.db.get(name)
+        if score is None:
+            raise KeyError(name)
+        return score
+
+    def __setitem__(self, name, score):
+        self.db._upsert(name, score)
+        self.names.add(name, score)
+
+    def __delitem__(self, name):
+        if self.db.conn.execute("DELETE FROM students WHERE name = ?", (name,)).rowcount == 0:
+            raise KeyError(name)
+        self.names.remove(name, None)
+
+    def __iter__(self):
+        for (name,) in self.db.conn.execute("SELECT name FROM students ORDER BY name"):
+            yield name
+
+    def items(self):
+        return self.db.items()
+
+    def values(self):
+        return (score for (score,) in self.db.conn.execute("SELECT score FROM students"))
+
+    def clear(self):
+        self.db.conn.execute("DELETE FROM students")
+        self.names.clear()
+
+
+# ------------------ Backend hooks for student_store ------------------ #
+def open_students(path=DB_FILE):
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    return SqliteStudents(path)
+
+
+def commit_students(students, path):
+    """Commit ``students`` if it is an open view of ``path``; False leaves the saving to student_store."""
+    if isinstance(students, SqliteStudents) and students.path == path:
+        students.commit()
+        return True
+    return False
+
+
+def apply_changes(path, records):
+    with SqliteScoreStore(path) as store:
+        store.apply(records)
+
+
+def write_scores(path, items):
+    with SqliteScoreStore(path) as store:
+        store.replace_all(items)
+
+
+# ------------------ Import / Export ------------------ #
+def import_csv(csv_path, db_path=DB_FILE):
+    data = dict(iter_score_rows(csv_path))
+    replay_journal(data, journal_path(csv_path))
+    write_scores(db_path, data.items())
+    return len(data)
+
+
+def export_csv(db_path=DB_FILE, csv_path='students_score.csv'):
+    count = 0
+    with SqliteScoreStore(db_path) as store, open(csv_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        for name, score in store.items():
+            writer.writerow([name, score])
+            count += 1
+    try:
+        os.remove(journal_path(csv_path))
+    except FileNotFoundError:
+        pass
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move student scores between students_score.csv and SQLite.")
+    parser.add_argument("direction", choices=["import", "export"],
+                        help="import: CSV -> SQLite, export: SQLite -> CSV")
+    parser.add_argument("--csv", default='students_score.csv')
+    parser.add_argument("--db", default=DB_FILE)
+    args = parser.parse_args(argv)
+    if args.direction == "import":
+        print(f"Imported {import_csv(args.csv, args.db)} students into {args.db}")
+    else:
+        print(f"Exported {export_csv(args.db, args.csv)} students to {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
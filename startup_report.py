@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+
+# Import this module first in an entry point so STARTED is taken before the
+# other imports. The report is printed when the script is run with
+# --startup-report or STUDENT_STARTUP_REPORT=1.
+STARTED = time.perf_counter()
+_marks = []
+
+
+def enabled():
+    return "--startup-report" in sys.argv or bool(os.environ.get("STUDENT_STARTUP_REPORT"))
+
+
+def mark(label):
+    """Record the end of a startup phase."""
+    _marks.append((label, time.perf_counter()))
+
+
+def report(file=None):
+    """Print how long each marked phase took and the total time to the first prompt."""
+    if not enabled() or not _marks:
+        return
+    file = file or sys.stderr
+    print("Startup timing:", file=file)
+    previous = STARTED
+    for label, at in _marks:
+        print(f"  {label:<22}{(at - previous) * 1000:9.1f} ms", file=file)
+        previous = at
+    print(f"  {'time to first prompt':<22}{(previous - STARTED) * 1000:9.1f} ms", file=file)
+    _marks.clear()
@@ -1,16 +1,12 @@
-import csv
+from class_stats import stats_for
+from student_store import StudentStore, load_store, save_store
 
 # Load student scores from CSV
 def load_students():
-    students = {}
     try:
-        with open('students_score.csv', mode='r') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if len(row) >= 2 and row[1].isdigit():
-                    students[row[0]] = int(row[1])
+        students = load_store()
     except FileNotFoundError:
-        default_students = {
+        default_students = StudentStore({
             "Soala_Amachree": 97, "Desmond_Ozondu": 91, "Obasi_Princewill": 99,
             "Joshua_Eze-ochia": 90, "Christopher_Egere": 65, "Amadi_Greatman": 65,
             "Havilah_Oghenejivwe": 85, "Grace_Chitchuga": 95, "Redeemer_Messiah": 46,
@@ -20,28 +16,19 @@ def load_students():
             "Melvin_Nick": 20, "Delight_Justice": 0, "Morenike_Abioye": 0, "Prasie_Ogu": 62,
             "Olayinka_Oghenejivwe": 87, "Chatem_Julia": 80, "Sarah_Ozondu": 67,
             "Francis_John": 74, "David_Ernsest": 72
-        }
+        })
         save_students(default_students)
         return default_students
     return students
 
 def save_students(students):
-    with open('students_score.csv', mode='w', newline='') as file:
-        writer = csv.writer(file)
-        for name, score in students.items():
-            writer.writerow([name, score])
+    save_store(students)
 
 def rank_students(data):
     return sorted(data.items(), key=lambda x: x[1], reverse=True)
 
 def show_histogram(students_score):
-    scores = students_score.values()
-    bins = {0:0, 50:0, 70:0, 90:0}
-    for score in scores:
-        if score >= 90: bins[90] += 1
-        elif score >= 70: bins[70] += 1
-        elif score >= 50: bins[50] += 1
-        else: bins[0] += 1
+    bins = stats_for(students_score).bins
     print("\nScore Distribution:")
     for threshold, count in sorted(bins.items()):
         bar = "■" * count
@@ -53,15 +40,14 @@ def display_student_names(students_score):
         print(name)
 
 def calculate_statistics(students_score):
-    scores = students_score.values()
-    max_score = max(scores)
-    min_score = min(scores)
-    average = sum(scores) / len(scores)
+    stats = stats_for(students_score)
     print(f"\nClass Statistics:")
-    print(f"Total students: {len(students_score)}")
-    print(f"Highest score: {max_score}")
-    print(f"Lowest score: {min_score}")
-    print(f"Average score: {average:.2f}")
+    print(f"Total students: {stats.count}")
+    print(f"Highest score: {stats.highest}")
+    print(f"Lowest score: {stats.lowest}")
+    print(f"Average score: {stats.average:.2f}")
+    if stats.count:
+        print("Percentiles: " + ", ".join(f"P{pct} {score}" for pct, score in stats.percentiles().items()))
 
 def main():
     students_score = load_students()
@@ -74,15 +60,12 @@ def main():
     if name in students_score:
         score = students_score[name]
         print(f"{name}: {score}\n")
-        ranking = rank_students(students_score)
-        for pos, (student, _) in enumerate(ranking, start=1):
-            if student == name:
-                suffix = "th"
-                if pos == 1: suffix = "st"
-                elif pos == 2: suffix = "nd"
-                elif pos == 3: suffix = "rd"
-                print(f"{name} is in position {pos}{suffix}")
-                break
+        pos = students_score.ranking.rank(name)
+        suffix = "th"
+        if pos == 1: suffix = "st"
+        elif pos == 2: suffix = "nd"
+        elif pos == 3: suffix = "rd"
+        print(f"{name} is in position {pos}{suffix}")
 
         if input("See all scores? (yes/no): ").lower() == "yes":
             for student, score in students_score.items():
@@ -99,20 +82,20 @@ def main():
         print(f"Did you mean {last}_{first}?")
 
     else:
+        suggestions = students_score.names.suggest(name)
+        if suggestions:
+            print(f"Did you mean: {', '.join(suggestions)}?")
         if input("Student not found. Add student? (yes/no): ").lower() == "yes":
             try:
                 new_score = int(input(f"Enter score for {name}: "))
                 students_score[name] = new_score
                 save_students(students_score)
-                ranking = rank_students(students_score)
-                for pos, (student, _) in enumerate(ranking, start=1):
-                    if student == name:
-                        suffix = "th"
-                        if pos == 1: suffix = "st"
-                        elif pos == 2: suffix = "nd"
-                        elif pos == 3: suffix = "rd"
-                        print(f"{name} is in position {pos}{suffix}")
-                        break
+                pos = students_score.ranking.rank(name)
+                suffix = "th"
+                if pos == 1: suffix = "st"
+                elif pos == 2: suffix = "nd"
+                elif pos == 3: suffix = "rd"
+                print(f"{name} is in position {pos}{suffix}")
             except ValueError:
                 print("Invalid score. Please enter a number.")
 
@@ -1,18 +1,14 @@
-import csv
+from class_stats import stats_for
+from rank_index import top_students
+from student_store import StudentStore, load_store, save_store
 
 #1 Load initial student scores from CSV
 def load_students():
-    students = {}
     try:
-        with open('students_score.csv', mode='r') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if len(row) >= 2 and row[1].isdigit():
-                    students[row[0]] = int(row[1])
-
+        students = load_store()
     except FileNotFoundError:
         # If file doesn't exist, create it with default data
-        default_students = {
+        default_students = StudentStore({
             "Soala_Amachree": 97, "Desmond_Ozondu": 91, "Obasi_Princewill": 99,
             "Joshua_Eze-ochia": 90, "Christopher_Egere": 65, "Amadi_Greatman": 65,
             "Havilah_Oghenejivwe": 85, "Grace_Chitchuga": 95, "Redeemer_Messiah": 46,
@@ -22,16 +18,13 @@ def load_students():
             "Melvin_Nick": 20, "Delight_Justice": 0, "Morenike_Abioye": 0, "Prasie_Ogu": 62,
             "Olayinka_Oghenejivwe": 87, "Chatem_Julia": 80, "Sarah_Ozondu": 67,
             "Francis_John": 74, "David_Ernsest": 72
-        }
+        })
         save_students(default_students)
         return default_students
     return students
 
 def save_students(students):
-    with open('students_score.csv', mode='w', newline='') as file:
-        writer = csv.writer(file)
-        for name, score in students.items():
-            writer.writerow([name, score])
+    save_store(students)
 
 students_score = load_students()
 
@@ -45,15 +38,7 @@ def rank_students(data):
     return sorted(data.items(), key=lambda x: x[1], reverse=True)
 
 def show_histogram():
-    scores = students_score.values()
-    bins = {0:0, 50:0, 70:0, 90:0}  # Score ranges
-    
-    for score in scores:
-        if score >= 90: bins[90] += 1
-        elif score >= 70: bins[70] += 1
-        elif score >= 50: bins[50] += 1
-        else: bins[0] += 1
-    
+    bins = stats_for(students_score).bins
     print("\nScore Distribution:")
     for threshold, count in sorted(bins.items()):
         bar = "■" * count
@@ -73,24 +58,19 @@ def is_admin():
 
 #6 Function to calculate and print class statistics
 def calculate_statistics():
-    scores = students_score.values()
-    max_score = max(scores)
-    min_score = min(scores)
-    average = sum(scores) / len(scores)
+    stats = stats_for(students_score)
     print(f"\nClass Statistics:")
-    print(f"Total students: {len(students_score)}")
-    print(f"Highest score: {max_score}")
-    print(f"Lowest score: {min_score}")
-    print(f"Average score: {average:.2f}")
-
-#7 Convert dictionary to a list of tuples (name, score)
-students_list = list(students_score.items())
+    print(f"Total students: {stats.count}")
+    print(f"Highest score: {stats.highest}")
+    print(f"Lowest score: {stats.lowest}")
+    print(f"Average score: {stats.average:.2f}")
+    if stats.count:
+        print("Percentiles: " + ", ".join(f"P{pct} {score}" for pct, score in stats.percentiles().items()))
 
-#8 Find the student with the highest score
-top_student = max(students_list, key=lambda x: x[1])
+#8 Find the student with the highest score (from the maintained ranking, no copy or scan)
+top_student = top_students(students_score, 1)[0]
 
 #9 Print top student info
-ranking = rank_students(students_score)
 print(f"\nThe top student is {top_student[0]} with a grade of {top_student[1]}\n")
 
 #10 Prompt user for student name to check score
@@ -109,18 +89,15 @@ def main():
         print()
 
         #13 Get and print ranking of the student
-        ranking = rank_students(students_score)
-        for position, (student, _) in enumerate(ranking, start=1):
-            if student == name:
-                suffix = "th"
-                if position == 1:
-                    suffix = "st"
-                elif position == 2:
-                    suffix = "nd"
-                elif position == 3:
-                    suffix = "rd"
-                print(f"{name} is in position {position}{suffix}")
-                break
+        position = students_score.ranking.rank(name)
+        suffix = "th"
+        if position == 1:
+            suffix = "st"
+        elif position == 2:
+            suffix = "nd"
+        elif position == 3:
+            suffix = "rd"
+        print(f"{name} is in position {position}{suffix}")
 
         #14 Ask if user wants to see all scores
         reply = input("Would you like to see the scores of the other students (yes/no): ").lower()
@@ -157,6 +134,9 @@ def main():
 
     #18 If neither format is found
     else:
+        suggestions = students_score.names.suggest(name)
+        if suggestions:
+            print(f"Did you mean: {', '.join(suggestions)}?")
         reply6 = input("Sorry, not found. Would you like to add the student? (yes/no): ").lower()
         if reply6 == "no":
             print("Please try again with the correct name format.")
@@ -171,18 +151,15 @@ def main():
                 new_score = int(input(f"Enter score for {name}: "))
                 students_score[name] = new_score
                 save_students(students_score)  # Save to CSV
-                ranking = rank_students(students_score)
-                for position, (student, _) in enumerate(ranking, start=1):
-                    if student == name:
-                        suffix = "th"
-                        if position == 1:
-                            suffix = "st"
-                        elif position == 2:
-                            suffix = "nd"
-                        elif position == 3:
-                            suffix = "rd"
-                        print(f"{name} has been added and is in position {position}{suffix}")
-                        break
+                position = students_score.ranking.rank(name)
+                suffix = "th"
+                if position == 1:
+                    suffix = "st"
+                elif position == 2:
+                    suffix = "nd"
+                elif position == 3:
+                    suffix = "rd"
+                print(f"{name} has been added and is in position {position}{suffix}")
             except ValueError:
                 print("Invalid score. Please enter a number.")
 
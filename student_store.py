@@ -0,0 +1,442 @@
+import contextlib
+import csv
+import io
+import marshal
+import os
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+from class_stats import ClassStats
+from name_index import NameIndex
+from rank_index import RankIndex
+
+SCORES_FILE = os.environ.get('STUDENT_SCORES_FILE', 'students_score.csv')
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+BINARY_SUFFIXES = ('.bin',)
+JOURNAL_SUFFIX = '.journal'
+CACHE_SUFFIX = '.cache'
+LOCK_SUFFIX = '.lock'
+CACHE_VERSION = 1
+COMPACT_MIN_RECORDS = 1000   # journal never compacts below this many records
+
+_DELETED = object()
+
+
+# ------------------ Student Store ------------------ #
+class StudentStore(dict):
+    """A ``name -> score`` dict that keeps its indexes in step with every change.
+
+    Existing code keeps using it as a plain dict (``students[name] = score``,
+    ``students.clear()``); each attached index sees the change as it happens
+    instead of being rebuilt from scratch on every lookup.
+    """
+
+    def __init__(self, data=(), **kwargs):
+        super().__init__(data, **kwargs)
+        self.ranking = RankIndex()
+        self.stats = ClassStats()
+        self.names = NameIndex()
+        self._indexes = [self.ranking, self.stats, self.names]
+        for index in self._indexes:
+            index.rebuild(self)
+        self._dirty = {}        # name -> score (or _DELETED) since the last save
+        self._cleared = False
+        self._source = None     # snapshot this store was loaded from
+        self._journal_records = 0
+        self._version = None    # (snapshot stamp, journal offset) last read from or written to _source
+
+    def __setitem__(self, name, score):
+        if name in self:
+            self._remove(name, dict.__getitem__(self, name))
+        dict.__setitem__(self, name, score)
+        self._dirty[name] = score
+        for index in self._indexes:
+            index.add(name, score)
+
+    def __delitem__(self, name):
+        score = dict.__getitem__(self, name)
+        dict.__delitem__(self, name)
+        self._dirty[name] = _DELETED
+        self._remove(name, score)
+
+    def _remove(self, name, score):
+        for index in self._indexes:
+            index.remove(name, score)
+
+    def update(self, data=(), **kwargs):
+        items = data.items() if hasattr(data, "items") else data
+        for name, score in items:
+            self[name] = score
+        for name, score in kwargs.items():
+            self[name] = score
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, name, score=None):
+        if name not in self:
+            self[name] = score
+        return self[name]
+
+    def pop(self, name, *default):
+        if name not in self:
+            return dict.pop(self, name, *default)
+        score = self[name]
+        del self[name]
+        return score
+
+    def popitem(self):
+        name, score = dict.popitem(self)
+        self._dirty[name] = _DELETED
+        self._remove(name, score)
+        return name, score
+
+    def clear(self):
+        dict.clear(self)
+        self._dirty.clear()
+        self._cleared = True
+        for index in self._indexes:
+            index.clear()
+
+    def copy(self):
+        return StudentStore(self)
+
+    def __reduce__(self):
+        # Rebuild through __init__ so the indexes exist before any item is set.
+        return StudentStore, (dict(self),)
+
+    def pending_changes(self):
+        """Journal records (``["C"]``, ``["U", name, score]``, ``["D", name]``) since the last save."""
+        records = [["C"]] if self._cleared else []
+        for name, score in self._dirty.items():
+            records.append(["D", name] if score is _DELETED else ["U", name, score])
+        return records
+
+    def mark_saved(self):
+        self._dirty.clear()
+        self._cleared = False
+
+    def _absorb(self, name, score):
+        """Take a change saved by another process without marking it as ours to save."""
+        if name in self:
+            self._remove(name, dict.pop(self, name))
+        if score is not _DELETED:
+            dict.__setitem__(self, name, score)
+            for index in self._indexes:
+                index.add(name, score)
+
+
+# ------------------ Persistence ------------------ #
+# The CSV snapshot is only rewritten on compaction. In between, every save
+# appends the changed students to a journal next to it:
+#   U,name,score   upsert
+#   D,name         delete
+#   C              clear all records
+# The parsed snapshot is also cached next to it in marshal format
+# (students_score.csv.cache), stamped with the CSV's mtime and size, so an
+# unchanged snapshot is never re-parsed at startup.
+# A path ending in one of SQLITE_SUFFIXES is stored in SQLite instead
+# (see sqlite_store.py), and one ending in BINARY_SUFFIXES in the mmap'd
+# fixed-width store (see binary_store.py); both apply the same records in place.
+#
+# Several processes may share one store. Saves hold an exclusive lock on
+# students_score.csv.lock only while writing, never for a whole session.
+# Each store remembers the snapshot and journal offset it last saw; on save
+# it first folds in whatever other processes appended since (keeping its own
+# value for any student it changed itself), then appends its own changes.
+def journal_path(path=SCORES_FILE):
+    return path + JOURNAL_SUFFIX
+
+
+@contextlib.contextmanager
+def store_lock(path=SCORES_FILE, shared=False):
+    """Hold the inter-process lock for the store at ``path`` (blocks until it is free)."""
+    with open(path + LOCK_SUFFIX, 'a+b') as file:
+        fd = file.fileno()
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue    # LK_LOCK gives up after ~10 s; keep waiting
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def parse_score(text):
+    try:
+        return int(text)
+    except ValueError:
+        score = float(text)
+        if score != score or score in (float('inf'), float('-inf')):
+            raise ValueError(f"not a usable score: {text!r}")
+        return score
+
+
+def iter_score_rows(path=SCORES_FILE):
+    """Yield ``(name, score)`` from a snapshot one row at a time.
+
+    Whole-number scores come back as ``int`` and report-card averages as
+    ``float``; rows without a numeric score are skipped.
+    """
+    with open(path, mode='r', newline='') as file:
+        for row in csv.reader(file):
+            if len(row) < 2:
+                continue
+            if row[1].isdigit():
+                yield row[0], int(row[1])
+                continue
+            try:
+                yield row[0], parse_score(row[1])
+            except ValueError:
+                continue
+
+
+def _backend(path):
+    """The storage module for ``path``, or None for the CSV snapshot and journal."""
+    if path.endswith(SQLITE_SUFFIXES):
+        import sqlite_store
+        return sqlite_store
+    if path.endswith(BINARY_SUFFIXES):
+        import binary_store
+        return binary_store
+    return None
+
+
+def load_store(path=SCORES_FILE):
+    """Load the snapshot at ``path`` and replay its journal on top.
+
+    Raises FileNotFoundError when there is no snapshot yet.
+    """
+    backend = _backend(path)
+    os.stat(path)   # FileNotFoundError before creating a lock file for a store that doesn't exist
+    if backend is not None:
+        # SQLite is queried in place: rank, top-N and stats never load the table
+        with store_lock(path, shared=True):
+            return backend.open_students(path)
+    with store_lock(path, shared=True):
+        snapshot = _file_stamp(path)
+        data = read_snapshot(path)
+        rows, end = read_journal(journal_path(path))
+    records = apply_records(data, rows)
+    students = StudentStore(data)
+    students._source = path
+    students._journal_records = records
+    students._version = (snapshot, end)
+    return students
+
+
+def _file_stamp(path):
+    """Changes whenever the snapshot is rewritten (compaction replaces the file)."""
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _cache_stamp(path):
+    stat = os.stat(path)
+    return [CACHE_VERSION, stat.st_mtime_ns, stat.st_size]
+
+
+def read_snapshot(path=SCORES_FILE):
+    """The snapshot at ``path`` as a dict, from its cache when the CSV is unchanged."""
+    stamp = _cache_stamp(path)
+    try:
+        with open(path + CACHE_SUFFIX, 'rb') as file:
+            cached_stamp, data = marshal.loads(file.read())
+        if cached_stamp == stamp:
+            return data
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    data = dict(iter_score_rows(path))
+    write_snapshot_cache(path, data, stamp)
+    return data
+
+
+def write_snapshot_cache(path, data, stamp=None):
+    tmp = f"{path}{CACHE_SUFFIX}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as file:
+            file.write(marshal.dumps([stamp or _cache_stamp(path), dict(data)]))
+        os.replace(tmp, path + CACHE_SUFFIX)
+    except (OSError, ValueError):
+        pass    # the cache is only an optimisation
+
+
+def read_journal(journal, offset=0):
+    """``(rows, end)``: the journal's records from byte ``offset`` on, and the offset after them."""
+    try:
+        with open(journal, mode='rb') as file:
+            file.seek(offset)
+            raw = file.read()
+    except FileNotFoundError:
+        return [], 0
+    return list(csv.reader(io.TextIOWrapper(io.BytesIO(raw), newline=''))), offset + len(raw)
+
+
+class _SavedChanges(dict):
+    """Collects journal records as name -> score (or _DELETED) instead of applying them."""
+
+    cleared = False
+
+    def pop(self, name, default=None):
+        self[name] = _DELETED
+
+    def clear(self):
+        dict.clear(self)
+        self.cleared = True
+
+
+def apply_records(students, rows):
+    """Apply journal ``rows`` to any dict-like ``students``; returns how many were applied."""
+    records = 0
+    for row in rows:
+        if not row:
+            continue
+        op = row[0]
+        if op == "U" and len(row) >= 3:
+            try:
+                students[row[1]] = parse_score(row[2])
+            except ValueError:
+                continue    # torn final record from an interrupted write
+        elif op == "D" and len(row) >= 2:
+            students.pop(row[1], None)
+        elif op == "C":
+            students.clear()
+        else:
+            continue
+        records += 1
+    return records
+
+
+def replay_journal(students, journal):
+    rows, _ = read_journal(journal)
+    return apply_records(students, rows)
+
+
+def _merge_saved(students, path):
+    """Fold in what other processes saved to ``path`` since ``students`` last read or wrote it.
+
+    Students changed in this store since then keep this store's value. A
+    pending clear supersedes everything saved before it, so nothing is merged.
+    """
+    snapshot = _file_stamp(path)
+    journal = journal_path(path)
+    if students._version is not None and students._version[0] == snapshot:
+        rows, end = read_journal(journal, students._version[1])
+        changes = _SavedChanges()
+        students._journal_records += apply_records(changes, rows)
+    else:
+        # Rewritten by someone else's compaction: their snapshot and journal
+        # are the whole saved state.
+        rows, end = read_journal(journal)
+        changes = _SavedChanges(read_snapshot(path))
+        changes.cleared = True
+        students._journal_records = apply_records(changes, rows)
+    students._version = (snapshot, end)
+    if students._cleared or not (changes or changes.cleared):
+        return
+    mine = students._dirty
+    if changes.cleared:
+        for name in [name for name in students if name not in changes and name not in mine]:
+            students._absorb(name, _DELETED)
+    for name, score in changes.items():
+        if name not in mine and dict.get(students, name, _DELETED) != score:
+            students._absorb(name, score)
+
+
+def _held_lock(path, locked, shared=False):
+    return contextlib.nullcontext() if locked else store_lock(path, shared)
+
+
+def refresh_store(students, path=SCORES_FILE, locked=False):
+    """Bring a long-lived ``students`` up to date with what other processes saved to ``path``.
+
+    ``locked`` says the caller already holds store_lock(path), as with
+    save_store() and compact_store().
+    """
+    if _backend(path) is not None or students._source != path:
+        return
+    with _held_lock(path, locked, shared=True):
+        _merge_saved(students, path)
+
+
+def save_store(students, path=SCORES_FILE, locked=False):
+    """Persist ``students``: an O(changes) journal append when possible, else a full snapshot."""
+    backend = _backend(path)
+    if backend is not None and backend.commit_students(students, path):
+        return
+    if (not isinstance(students, StudentStore) or students._source != path
+            or not os.path.exists(path)):
+        if backend is not None:
+            with _held_lock(path, locked):
+                backend.write_scores(path, students.items())
+            if isinstance(students, StudentStore):
+                students._source = path
+                students.mark_saved()
+        else:
+            compact_store(students, path, locked)
+        return
+    records = students.pending_changes()
+    if not records:
+        return
+    if backend is not None:
+        with _held_lock(path, locked):
+            backend.apply_changes(path, records)
+        students.mark_saved()
+        return
+    with _held_lock(path, locked):
+        _merge_saved(students, path)
+        records = students.pending_changes()
+        journal = journal_path(path)
+        with open(journal, mode='a', newline='') as file:
+            csv.writer(file).writerows(records)
+        students._version = (students._version[0], os.path.getsize(journal))
+        students._journal_records += len(records)
+        students.mark_saved()
+        if students._journal_records > max(COMPACT_MIN_RECORDS, len(students)):
+            _compact(students, path)
+
+
+def compact_store(students, path=SCORES_FILE, locked=False):
+    """Write a fresh snapshot of ``students`` and drop the journal it supersedes.
+
+    A store loaded from ``path`` first takes in what other processes saved
+    there since, as save_store() does, so compacting never loses their writes.
+    """
+    with _held_lock(path, locked):
+        if isinstance(students, StudentStore) and students._source == path and os.path.exists(path):
+            _merge_saved(students, path)
+        _compact(students, path)
+
+
+def _compact(students, path):
+    tmp = path + '.tmp'
+    with open(tmp, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        for name, score in students.items():
+            writer.writerow([name, score])
+    os.replace(tmp, path)
+    write_snapshot_cache(path, students)
+    try:
+        os.remove(journal_path(path))
+    except FileNotFoundError:
+        pass
+    if isinstance(students, StudentStore):
+        students._source = path
+        students._journal_records = 0
+        students._version = (_file_stamp(path), 0)
+        students.mark_saved()
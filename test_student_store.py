@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+import student_store
+from student_store import compact_store, load_store, refresh_store, save_store
+
+
+def _writer(path, prefix, count):
+    """Child process: add ``count`` students one save at a time, compacting now and then."""
+    student_store.COMPACT_MIN_RECORDS = 5
+    students = load_store(path)
+    for i in range(count):
+        students[f"{prefix}_{i}"] = i
+        save_store(students, path)
+        if i % 7 == 0:
+            compact_store(students, path)
+
+
+class TwoWriterTests(unittest.TestCase):
+    """Two stores loaded from the same snapshot, saving in turn, must not lose each other's writes."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "scores.csv")
+        save_store({"a": 1, "b": 2, "c": 3}, self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_saves_merge(self):
+        first, second = load_store(self.path), load_store(self.path)
+        first["d"] = 4
+        del first["a"]
+        save_store(first, self.path)
+        second["e"] = 5
+        second["b"] = 20
+        save_store(second, self.path)
+        self.assertEqual(dict(load_store(self.path)), {"b": 20, "c": 3, "d": 4, "e": 5})
+        # What the second writer saved last wins for a student both changed
+        first["b"] = 200
+        save_store(first, self.path)
+        second["b"] = 2000
+        save_store(second, self.path)
+        self.assertEqual(load_store(self.path)["b"], 2000)
+
+    def test_compaction_keeps_other_writers_saves(self):
+        first, second = load_store(self.path), load_store(self.path)
+        first["d"] = 4
+        save_store(first, self.path)
+        compact_store(second, self.path)
+        self.assertEqual(dict(load_store(self.path)), {"a": 1, "b": 2, "c": 3, "d": 4})
+        self.assertFalse(os.path.exists(student_store.journal_path(self.path)))
+
+    def test_save_after_other_writers_compaction(self):
+        first, second = load_store(self.path), load_store(self.path)
+        first["d"] = 4
+        del first["c"]
+        compact_store(first, self.path)
+        second["e"] = 5
+        save_store(second, self.path)
+        self.assertEqual(dict(load_store(self.path)), {"a": 1, "b": 2, "d": 4, "e": 5})
+        self.assertEqual(dict(second), {"a": 1, "b": 2, "d": 4, "e": 5})
+
+    def test_clear_supersedes_earlier_saves(self):
+        first, second = load_store(self.path), load_store(self.path)
+        first["d"] = 4
+        save_store(first, self.path)
+        second.clear()
+        second["z"] = 26
+        save_store(second, self.path)
+        self.assertEqual(dict(load_store(self.path)), {"z": 26})
+
+    def test_refresh_picks_up_saves(self):
+        first, second = load_store(self.path), load_store(self.path)
+        first["d"] = 4
+        save_store(first, self.path)
+        compact_store(first, self.path)
+        first["e"] = 5
+        save_store(first, self.path)
+        refresh_store(second, self.path)
+        self.assertEqual(dict(second), {"a": 1, "b": 2, "c": 3, "d": 4, "e": 5})
+        self.assertEqual(second.ranking.rank("e"), 1)
+
+    def test_concurrent_processes_with_compaction(self):
+        workers = [multiprocessing.Process(target=_writer, args=(self.path, f"w{n}", 40)) for n in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+        expected = {"a": 1, "b": 2, "c": 3}
+        expected.update({f"w{n}_{i}": i for n in range(4) for i in range(40)})
+        self.assertEqual(dict(load_store(self.path)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()